@@ -2,7 +2,7 @@
 
 import asyncio
 import time
-from llmx import llm
+from llmx import StreamAccumulator, StreamWriter, llm
 
 
 async def basic_async_example():
@@ -64,10 +64,10 @@ async def async_streaming_example():
     print("Streaming response:")
     print("Assistant: ", end="", flush=True)
 
-    content = ""
+    content = StreamAccumulator()
+    writer = StreamWriter()
     async for chunk in await generator.async_generate(messages, stream=True):
-        print(chunk.content, end="", flush=True)
-        content += chunk.content
+        writer.write(content.add(chunk), chunk.done)
         if chunk.done:
             break
 
@@ -1,7 +1,29 @@
 """Streaming examples for LLMX."""
 
 import asyncio
-from llmx import llm
+from llmx import StreamAccumulator, StreamWriter, llm
+
+
+class WordCounter:
+    """Count words and characters of a streamed response.
+
+    Chunks often end mid-word, so a word continued by the next chunk is only
+    counted once.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.chars = 0
+        self._in_word = False
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        self.chars += len(text)
+        self.words += len(text.split())
+        if self._in_word and not text[0].isspace():
+            self.words -= 1
+        self._in_word = not text[-1].isspace()
 
 
 def basic_streaming():
@@ -13,10 +35,10 @@ def basic_streaming():
 
     print("Assistant: ", end="", flush=True)
 
-    full_content = ""
+    full_content = StreamAccumulator()
+    writer = StreamWriter()
     for chunk in generator.generate(messages, stream=True, max_tokens=200):
-        print(chunk.content, end="", flush=True)
-        full_content += chunk.content
+        writer.write(full_content.add(chunk), chunk.done)
 
         if chunk.done:
             print(f"\n\n[Stream completed. Total characters: {len(full_content)}]")
@@ -33,18 +55,17 @@ def streaming_with_processing():
     print("Processing stream in real-time:")
     print("Assistant: ", end="", flush=True)
 
-    word_count = 0
-    char_count = 0
+    counter = WordCounter()
 
+    writer = StreamWriter()
     for chunk in generator.generate(messages, stream=True):
-        print(chunk.content, end="", flush=True)
+        writer.write(chunk.content, chunk.done)
 
         # Process chunk in real-time
-        char_count += len(chunk.content)
-        word_count += len(chunk.content.split())
+        counter.feed(chunk.content)
 
         if chunk.done:
-            print(f"\n\n[Final stats: {word_count} words, {char_count} characters]")
+            print(f"\n\n[Final stats: {counter.words} words, {counter.chars} characters]")
             break
 
 
@@ -57,8 +78,9 @@ async def async_streaming():
 
     print("Assistant: ", end="", flush=True)
 
+    writer = StreamWriter()
     async for chunk in await generator.async_generate(messages, stream=True, max_tokens=150):
-        print(chunk.content, end="", flush=True)
+        writer.write(chunk.content, chunk.done)
 
         if chunk.done:
             print("\n\n[Async stream completed]")
@@ -87,15 +109,15 @@ def streaming_conversation():
 
         print("Assistant: ", end="", flush=True)
 
-        response_content = ""
+        response_content = StreamAccumulator()
+        writer = StreamWriter()
         for chunk in generator.generate(messages, stream=True):
-            print(chunk.content, end="", flush=True)
-            response_content += chunk.content
+            writer.write(response_content.add(chunk), chunk.done)
 
             if chunk.done:
                 break
 
-        messages.append({"role": "assistant", "content": response_content})
+        messages.append({"role": "assistant", "content": response_content.text})
         print()  # New line after response
 
 
@@ -110,8 +132,9 @@ def streaming_with_interruption():
     print("Assistant: ", end="", flush=True)
 
     try:
+        writer = StreamWriter()
         for chunk in generator.generate(messages, stream=True):
-            print(chunk.content, end="", flush=True)
+            writer.write(chunk.content, chunk.done)
 
             if chunk.done:
                 print("\n\n[Stream completed naturally]")
@@ -146,11 +169,12 @@ def compare_streaming_vs_non_streaming():
     first_token_time = None
 
     print("Assistant: ", end="", flush=True)
+    writer = StreamWriter()
     for chunk in generator.generate(messages, stream=True, max_tokens=100):
         if first_token_time is None and chunk.content:
             first_token_time = time.time()
 
-        print(chunk.content, end="", flush=True)
+        writer.write(chunk.content, chunk.done)
 
         if chunk.done:
             end_time = time.time()
@@ -13,15 +13,48 @@ Example usage:
     print(response.text[0].content)
 """
 
-from llmx.core import llm
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from llmx.exceptions import (
     LLMXError,
     ProviderError,
     RateLimitError,
     AuthenticationError,
+    CircuitOpenError,
+    BatchError,
     ValidationError,
 )
-from llmx.types import Message, Response, Choice
+
+if TYPE_CHECKING:
+    from llmx.core import llm
+    from llmx.streaming import StreamAccumulator, StreamWriter
+    from llmx.types import Message, Response, Choice
+
+# Attributes imported on first access (PEP 562), so that importing llmx, e.g.
+# for ``llmx --help``, does not load pydantic, httpx and the providers.
+_LAZY_ATTRS = {
+    "llm": "llmx.core",
+    "StreamAccumulator": "llmx.streaming",
+    "StreamWriter": "llmx.streaming",
+    "Message": "llmx.types",
+    "Response": "llmx.types",
+    "Choice": "llmx.types",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __version__ = "2.0.0"
 __all__ = [
@@ -30,8 +63,12 @@ __all__ = [
     "ProviderError",
     "RateLimitError",
     "AuthenticationError",
+    "CircuitOpenError",
+    "BatchError",
     "ValidationError",
     "Message",
     "Response",
     "Choice",
+    "StreamAccumulator",
+    "StreamWriter",
 ]
\ No newline at end of file
@@ -1,25 +1,188 @@
 """Caching functionality for LLMX."""
 
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import hashlib
-import json
-import pickle
-from typing import Any, Dict, List, Optional
+import importlib.util
+import struct
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import cachetools
+import orjson
+import xxhash
+import zstandard
 
 from llmx.exceptions import CacheError
 from llmx.types import CacheConfig, GenerationConfig, Message, Response
 
+# Fixed-layout encoding of the sampling parameters that take part in the cache
+# key. Each optional value is preceded by a presence flag so that ``None`` and
+# ``0`` / ``0.0`` never produce the same bytes.
+_KEY_PARAMS = struct.Struct("<?q?d?d")
+_LENGTH = struct.Struct("<I")
+
+# Encoded role and separator of each message in the key, built once
+_ROLE_BYTES = {role: role.encode() + b"\x00" for role in ("system", "user", "assistant")}
+
+# Serialized responses are tagged so that entries written in another format
+# (e.g. pickles from older releases) are treated as misses instead of errors.
+_ZSTD_MAGIC = b"Z"
+_ZSTD_LEVEL = 3
+
+# Payloads above this size are (de)serialized on a worker thread by the async
+# paths so that large cache entries do not stall the event loop; smaller ones
+# are cheaper to handle inline than to hand off.
+_OFFLOAD_BYTES = 16 * 1024
+
+# Keys fetched per SCAN step (and deleted per UNLINK) when clearing Redis
+_SCAN_COUNT = 1000
+
+
+class KeyState(NamedTuple):
+    """Hash state covering the first ``count`` messages of a conversation."""
+
+    count: int
+    hasher: Any
+
+
+class Flight(NamedTuple):
+    """A request registered with ``track_inflight``.
+
+    Only the ``leader`` calls the provider and publishes the response on
+    ``future``; every other caller with the same key waits on ``future``.
+    """
+
+    leader: bool
+    future: Any
+
+
+class FlightAbandoned(Exception):
+    """Set on an async flight whose leader was cancelled or left without a result.
+
+    Waiting callers should issue the request again; the first to do so becomes
+    the new leader.
+    """
+
+
+def _feed_messages(write: Callable[[bytes], Any], messages: Iterable[Message]) -> None:
+    """Write the messages part of the cache key inputs to ``write``."""
+    pack = _LENGTH.pack
+    for msg in messages:
+        content = msg.content.encode()
+        write(_ROLE_BYTES.get(msg.role) or msg.role.encode() + b"\x00")
+        write(pack(len(content)))
+        write(content)
+        write(b"\x01")
+
+
+def _feed_params(write: Callable[[bytes], Any], config: GenerationConfig, provider: str) -> None:
+    """Write the config part of the cache key inputs to ``write``."""
+    write(
+        _KEY_PARAMS.pack(
+            config.max_tokens is not None,
+            config.max_tokens or 0,
+            config.temperature is not None,
+            config.temperature or 0.0,
+            config.top_p is not None,
+            config.top_p or 0.0,
+        )
+    )
+    for field in (config.model or "", provider):
+        encoded = field.encode()
+        write(_LENGTH.pack(len(encoded)))
+        write(encoded)
+
+
+def _serialize(response: Response) -> bytes:
+    """Encode a response for storage in Redis."""
+    raw = orjson.dumps(response.model_dump())
+    return _ZSTD_MAGIC + zstandard.compress(raw, _ZSTD_LEVEL)
+
+
+def _deserialize(data: bytes) -> Optional[Response]:
+    """Decode a response stored by ``_serialize``."""
+    if not data.startswith(_ZSTD_MAGIC):
+        return None
+    raw = zstandard.decompress(data[len(_ZSTD_MAGIC):])
+    return Response.model_validate(orjson.loads(raw))
+
+
+@functools.lru_cache(maxsize=1)
+def _codec_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Get the worker threads shared by all caches for large payloads."""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="llmx-cache")
+
+
+async def _aserialize(response: Response) -> bytes:
+    """Serialize off the event loop when the response is large."""
+    if sum(len(choice.content) for choice in response.text) <= _OFFLOAD_BYTES:
+        return _serialize(response)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_codec_executor(), _serialize, response)
+
+
+async def _adeserialize(data: bytes) -> Optional[Response]:
+    """Deserialize off the event loop when the payload is large."""
+    if len(data) <= _OFFLOAD_BYTES:
+        return _deserialize(data)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_codec_executor(), _deserialize, data)
+
 
 class CacheManager:
     """Manages caching for LLM responses."""
 
-    def __init__(self, config: CacheConfig):
-        """Initialize cache manager."""
+    def __init__(self, config: CacheConfig, embedder: Optional[Callable[[str], Any]] = None):
+        """
+        Initialize cache manager.
+
+        Args:
+            config: Cache configuration
+            embedder: Callable mapping prompt text to an embedding vector for the
+                semantic tier (loads ``config.embedding_model`` if None)
+        """
         self.config = config
-        self._memory_cache: Dict[str, Any] = {}
+        # cachetools caches are not thread-safe, so every access goes through
+        # ``_memory_lock``.
+        self._memory_cache: cachetools.TTLCache = cachetools.TTLCache(
+            maxsize=config.max_memory_entries, ttl=config.ttl
+        )
+        self._memory_lock = threading.RLock()
         self._redis_client = None
+        self._aredis_client = None
+        self._semantic_index = None
+        self._embedder = embedder
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._async_inflight: Dict[str, asyncio.Future] = {}
 
         if config.redis_url and config.enabled:
             self._init_redis()
+        if config.semantic and config.enabled:
+            self._check_semantic_dependencies()
+
+    def _check_semantic_dependencies(self) -> None:
+        """Fail at construction, not on every request, if the semantic tier can't load."""
+        required = ["numpy"] if self._embedder else ["numpy", "sentence_transformers"]
+        if any(importlib.util.find_spec(name) is None for name in required):
+            raise CacheError(
+                "Semantic caching dependency not installed. "
+                "Install with: pip install 'llmx[semantic]'"
+            )
 
     def _init_redis(self):
         """Initialize Redis client."""
@@ -33,23 +196,239 @@ class CacheManager:
         except Exception as e:
             raise CacheError(f"Failed to connect to Redis: {e}")
 
+    def _get_async_redis(self):
+        """Get the asyncio Redis client, creating it on first use."""
+        if self._aredis_client is None and self._redis_client:
+            import redis.asyncio
+
+            self._aredis_client = redis.asyncio.from_url(
+                self.config.redis_url, max_connections=self.config.redis_pool_size
+            )
+        return self._aredis_client
+
+    def _new_hasher(self) -> Any:
+        """Create an empty hasher of the configured kind."""
+        return hashlib.sha256() if self.config.secure_keys else xxhash.xxh3_128()
+
     def get_cache_key(
-        self, messages: List[Message], config: GenerationConfig, provider: str
+        self,
+        messages: List[Message],
+        config: GenerationConfig,
+        provider: str,
+        prefix: Optional[KeyState] = None,
+    ) -> str:
+        """
+        Generate cache key for messages and config.
+
+        Args:
+            messages: Messages in the conversation
+            config: Generation configuration
+            provider: Provider name
+            prefix: State from ``message_state`` for an earlier prefix of
+                ``messages``; only the messages after it are hashed
+        """
+        if prefix is not None:
+            return self.get_cache_key_from_state(
+                self.message_state(messages, prefix), config, provider
+            )
+
+        # Stream the fields straight into the hasher: for both SHA-256 and
+        # xxh3 this beats building an intermediate copy of the input.
+        hasher = self._new_hasher()
+        _feed_messages(hasher.update, messages)
+        _feed_params(hasher.update, config, provider)
+        return f"{self.config.key_prefix}{hasher.hexdigest()}"
+
+    def message_state(
+        self, messages: List[Message], prefix: Optional[KeyState] = None
+    ) -> KeyState:
+        """
+        Get the hash state covering ``messages``.
+
+        When ``prefix`` covers the first ``prefix.count`` messages, hashing
+        resumes from it, so extending a conversation by one turn costs only
+        that turn rather than the whole history.
+        """
+        if prefix is not None and prefix.count <= len(messages):
+            hasher = prefix.hasher.copy()
+            _feed_messages(hasher.update, messages[prefix.count:])
+        else:
+            hasher = self._new_hasher()
+            _feed_messages(hasher.update, messages)
+        return KeyState(len(messages), hasher)
+
+    def get_cache_key_from_state(
+        self, state: KeyState, config: GenerationConfig, provider: str
     ) -> str:
-        """Generate cache key for messages and config."""
-        # Create a deterministic hash of the input
-        cache_data = {
-            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
-            "model": config.model,
-            "max_tokens": config.max_tokens,
-            "temperature": config.temperature,
-            "top_p": config.top_p,
-            "provider": provider,
-        }
-
-        cache_string = json.dumps(cache_data, sort_keys=True)
-        cache_hash = hashlib.sha256(cache_string.encode()).hexdigest()
-        return f"{self.config.key_prefix}{cache_hash}"
+        """Generate cache key from a ``message_state`` result and config."""
+        hasher = state.hasher.copy()
+        _feed_params(hasher.update, config, provider)
+        return f"{self.config.key_prefix}{hasher.hexdigest()}"
+
+    @contextlib.contextmanager
+    def track_inflight(self, key: str, share: bool = True) -> Iterator[Flight]:
+        """
+        Deduplicate identical requests made concurrently from several threads.
+
+        The first caller for ``key`` becomes the leader and must set the
+        result on ``flight.future``; later callers block on
+        ``flight.future.result()`` until it does. If the leader raises, the
+        exception is shared with the waiting callers. With ``share=False``
+        every caller leads its own request.
+        """
+        if not (share and self.config.enabled):
+            yield Flight(True, concurrent.futures.Future())
+            return
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = concurrent.futures.Future()
+
+        if not leader:
+            yield Flight(False, future)
+            return
+
+        try:
+            yield Flight(True, future)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            if not future.done():
+                future.cancel()
+
+    @contextlib.asynccontextmanager
+    async def async_track_inflight(self, key: str, share: bool = True) -> AsyncIterator[Flight]:
+        """
+        Async version of track_inflight for tasks on one event loop.
+
+        Waiting callers should ``await asyncio.shield(flight.future)`` so that
+        cancelling one of them does not cancel the shared request. The shared
+        future is never cancelled: if the leader is cancelled, it fails with
+        ``FlightAbandoned`` and the waiting callers retry.
+        """
+        share = share and self.config.enabled
+        loop = asyncio.get_running_loop()
+        future = self._async_inflight.get(key) if share else None
+        if future is not None and future.get_loop() is loop:
+            yield Flight(False, future)
+            return
+
+        future = loop.create_future()
+        if not share:
+            yield Flight(True, future)
+            return
+
+        self._async_inflight[key] = future
+        try:
+            yield Flight(True, future)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; let the waiters take over
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody was waiting
+            future.exception()
+            raise
+        finally:
+            if self._async_inflight.get(key) is future:
+                del self._async_inflight[key]
+            if not future.done():
+                future.set_exception(FlightAbandoned(key))
+                future.exception()
+
+    def _get_semantic_index(self):
+        """Get the semantic index, creating it on first use."""
+        if self._semantic_index is None:
+            try:
+                from llmx.semantic import SemanticIndex, load_embedder
+            except ImportError as e:
+                raise CacheError(
+                    "Semantic caching dependency not installed. "
+                    "Install with: pip install 'llmx[semantic]'"
+                ) from e
+
+            embedder = self._embedder or load_embedder(self.config.embedding_model)
+            self._semantic_index = SemanticIndex(
+                embedder,
+                threshold=self.config.semantic_threshold,
+                max_entries=self.config.max_memory_entries,
+            )
+        return self._semantic_index
+
+    def _semantic_query(
+        self, messages: List[Message], config: GenerationConfig, provider: str
+    ) -> Optional[Tuple[str, str]]:
+        """Split messages into a context scope key and the final user prompt."""
+        if not messages or messages[-1].role != "user":
+            return None
+        scope = self.get_cache_key(messages[:-1], config, provider)
+        return scope, messages[-1].content
+
+    def semantic_get(
+        self, messages: List[Message], config: GenerationConfig, provider: str
+    ) -> Optional[Response]:
+        """Get a cached response for a semantically similar final prompt."""
+        if not (self.config.enabled and self.config.semantic):
+            return None
+
+        query = self._semantic_query(messages, config, provider)
+        if query is None:
+            return None
+
+        try:
+            index = self._get_semantic_index()
+            key = index.search(*query)
+        except Exception:
+            # Silently fail and return None
+            return None
+        if not key:
+            return None
+
+        cached_response = self.get(key)
+        if cached_response is None:
+            # The entry expired or was evicted; stop matching prompts to it
+            index.discard(query[0], key)
+        return cached_response
+
+    def semantic_add(
+        self, key: str, messages: List[Message], config: GenerationConfig, provider: str
+    ) -> None:
+        """Index the final prompt of ``messages`` so paraphrases can find ``key``."""
+        if not (self.config.enabled and self.config.semantic):
+            return
+
+        query = self._semantic_query(messages, config, provider)
+        if query is None:
+            return
+
+        try:
+            self._get_semantic_index().add(*query, key)
+        except Exception:
+            # Silently fail
+            pass
+
+    def _memory_entry(self, key: str) -> Any:
+        """Get the raw memory cache entry for ``key``, or None."""
+        with self._memory_lock:
+            return self._memory_cache.get(key)
+
+    def _memory_set(self, key: str, response: Response, payload: Optional[bytes] = None) -> None:
+        """
+        Store ``response`` in the memory cache.
+
+        With ``compact_memory`` the entry is its serialized form; ``payload``
+        is that form when the caller already has it.
+        """
+        entry: Any = response
+        if self.config.compact_memory:
+            entry = payload if payload is not None else _serialize(response)
+        with self._memory_lock:
+            self._memory_cache[key] = entry
 
     def get(self, key: str) -> Optional[Response]:
         """Get response from cache."""
@@ -57,14 +436,21 @@ class CacheManager:
             return None
 
         try:
-            # Try Redis first
+            # Try memory cache first
+            entry = self._memory_entry(key)
+            if entry is not None:
+                return _deserialize(entry) if self.config.compact_memory else entry
+
+            # Fall back to Redis and promote hits into memory
             if self._redis_client:
                 cached_data = self._redis_client.get(key)
                 if cached_data:
-                    return pickle.loads(cached_data)
+                    cached_response = _deserialize(cached_data)
+                    if cached_response:
+                        self._memory_set(key, cached_response, cached_data)
+                        return cached_response
 
-            # Try memory cache
-            return self._memory_cache.get(key)
+            return None
         except Exception:
             # Silently fail and return None
             return None
@@ -75,28 +461,166 @@ class CacheManager:
             return
 
         try:
+            payload = None
             # Set in Redis
             if self._redis_client:
-                serialized_data = pickle.dumps(response)
-                self._redis_client.setex(key, self.config.ttl, serialized_data)
+                payload = _serialize(response)
+                self._redis_client.setex(key, self.config.ttl, payload)
 
             # Set in memory cache
-            self._memory_cache[key] = response
+            self._memory_set(key, response, payload)
         except Exception:
             # Silently fail
             pass
 
     async def async_get(self, key: str) -> Optional[Response]:
         """Async version of get."""
-        # For now, use sync version
-        # In future, could use aioredis for true async
-        return self.get(key)
+        if not self.config.enabled:
+            return None
+
+        try:
+            entry = self._memory_entry(key)
+            if entry is not None:
+                return await _adeserialize(entry) if self.config.compact_memory else entry
+
+            aredis = self._get_async_redis()
+            if aredis:
+                cached_data = await aredis.get(key)
+                if cached_data:
+                    cached_response = await _adeserialize(cached_data)
+                    if cached_response:
+                        self._memory_set(key, cached_response, cached_data)
+                        return cached_response
+
+            return None
+        except Exception:
+            # Silently fail and return None
+            return None
 
     async def async_set(self, key: str, response: Response) -> None:
         """Async version of set."""
-        # For now, use sync version
-        # In future, could use aioredis for true async
-        self.set(key, response)
+        if not self.config.enabled:
+            return
+
+        try:
+            payload = None
+            aredis = self._get_async_redis()
+            if aredis:
+                payload = await _aserialize(response)
+                await aredis.setex(key, self.config.ttl, payload)
+            elif self.config.compact_memory:
+                payload = await _aserialize(response)
+
+            self._memory_set(key, response, payload)
+        except Exception:
+            # Silently fail
+            pass
+
+    def mget(self, keys: List[str]) -> List[Optional[Response]]:
+        """Get several responses, fetching memory misses in one Redis round-trip."""
+        if not self.config.enabled:
+            return [None] * len(keys)
+
+        try:
+            with self._memory_lock:
+                results = [self._memory_cache.get(key) for key in keys]
+            if self.config.compact_memory:
+                results = [None if entry is None else _deserialize(entry) for entry in results]
+
+            missing = [i for i, cached_response in enumerate(results) if cached_response is None]
+            if missing and self._redis_client:
+                with self._redis_client.pipeline(transaction=False) as pipe:
+                    for i in missing:
+                        pipe.get(keys[i])
+                    payloads = pipe.execute()
+
+                for i, cached_data in zip(missing, payloads):
+                    if cached_data:
+                        cached_response = _deserialize(cached_data)
+                        if cached_response:
+                            results[i] = cached_response
+                            self._memory_set(keys[i], cached_response, cached_data)
+
+            return results
+        except Exception:
+            # Silently fail and report every key as a miss
+            return [None] * len(keys)
+
+    def mset(self, items: Dict[str, Response]) -> None:
+        """Set several responses in one Redis round-trip."""
+        if not self.config.enabled or not items:
+            return
+
+        try:
+            payloads: List[Optional[bytes]] = [None] * len(items)
+            if self._redis_client or self.config.compact_memory:
+                payloads = [_serialize(response) for response in items.values()]
+            if self._redis_client:
+                with self._redis_client.pipeline(transaction=False) as pipe:
+                    for key, payload in zip(items, payloads):
+                        pipe.setex(key, self.config.ttl, payload)
+                    pipe.execute()
+
+            for (key, response), payload in zip(items.items(), payloads):
+                self._memory_set(key, response, payload)
+        except Exception:
+            # Silently fail
+            pass
+
+    async def async_mget(self, keys: List[str]) -> List[Optional[Response]]:
+        """Get several responses, fetching memory misses in one Redis round-trip."""
+        if not self.config.enabled:
+            return [None] * len(keys)
+
+        try:
+            with self._memory_lock:
+                results = [self._memory_cache.get(key) for key in keys]
+            if self.config.compact_memory:
+                results = [
+                    None if entry is None else await _adeserialize(entry) for entry in results
+                ]
+
+            missing = [i for i, cached_response in enumerate(results) if cached_response is None]
+            aredis = self._get_async_redis()
+            if missing and aredis:
+                async with aredis.pipeline(transaction=False) as pipe:
+                    for i in missing:
+                        pipe.get(keys[i])
+                    payloads = await pipe.execute()
+
+                for i, cached_data in zip(missing, payloads):
+                    if cached_data:
+                        cached_response = await _adeserialize(cached_data)
+                        if cached_response:
+                            results[i] = cached_response
+                            self._memory_set(keys[i], cached_response, cached_data)
+
+            return results
+        except Exception:
+            # Silently fail and report every key as a miss
+            return [None] * len(keys)
+
+    async def async_mset(self, items: Dict[str, Response]) -> None:
+        """Set several responses in one Redis round-trip."""
+        if not self.config.enabled or not items:
+            return
+
+        try:
+            payloads: List[Optional[bytes]] = [None] * len(items)
+            aredis = self._get_async_redis()
+            if aredis or self.config.compact_memory:
+                payloads = [await _aserialize(response) for response in items.values()]
+            if aredis:
+                async with aredis.pipeline(transaction=False) as pipe:
+                    for key, payload in zip(items, payloads):
+                        pipe.setex(key, self.config.ttl, payload)
+                    await pipe.execute()
+
+            for (key, response), payload in zip(items.items(), payloads):
+                self._memory_set(key, response, payload)
+        except Exception:
+            # Silently fail
+            pass
 
     def clear(self) -> None:
         """Clear all cached responses."""
@@ -105,12 +629,52 @@ class CacheManager:
 
         try:
             if self._redis_client:
-                # Clear all keys with our prefix
-                keys = self._redis_client.keys(f"{self.config.key_prefix}*")
+                # Clear all keys with our prefix. SCAN walks the keyspace
+                # incrementally instead of blocking Redis like KEYS, and
+                # UNLINK frees the values on a background thread.
+                cursor = 0
+                while True:
+                    cursor, keys = self._redis_client.scan(
+                        cursor, match=f"{self.config.key_prefix}*", count=_SCAN_COUNT
+                    )
+                    if keys:
+                        self._redis_client.unlink(*keys)
+                    if cursor == 0:
+                        break
+
+            self._clear_local()
+        except Exception:
+            # Silently fail
+            pass
+
+    async def async_clear(self) -> None:
+        """Async version of clear."""
+        if not self.config.enabled:
+            return
+
+        try:
+            aredis = self._get_async_redis()
+            if aredis:
+                keys = []
+                async for key in aredis.scan_iter(
+                    match=f"{self.config.key_prefix}*", count=_SCAN_COUNT
+                ):
+                    keys.append(key)
+                    if len(keys) >= _SCAN_COUNT:
+                        await aredis.unlink(*keys)
+                        keys = []
                 if keys:
-                    self._redis_client.delete(*keys)
+                    await aredis.unlink(*keys)
 
-            self._memory_cache.clear()
+            self._clear_local()
         except Exception:
             # Silently fail
-            pass
\ No newline at end of file
+            pass
+
+    def _clear_local(self) -> None:
+        """Clear the in-process tiers."""
+        with self._memory_lock:
+            self._memory_cache.clear()
+
+        if self._semantic_index is not None:
+            self._semantic_index.clear()
\ No newline at end of file
@@ -2,18 +2,34 @@
 
 import argparse
 import asyncio
-import json
-import os
+import functools
 import sys
-from typing import Optional
+from typing import List, Optional
 
-from llmx import llm
 from llmx.exceptions import LLMXError
 from llmx.providers import list_providers
+from llmx.streaming import StreamWriter
 
 
+def llm(*args, **kwargs):
+    """Create a generator (see ``llmx.llm``), importing the core on first use."""
+    from llmx.core import llm as _llm
+
+    return _llm(*args, **kwargs)
+
+
+def _positive_int(value: str) -> int:
+    """Parse a strictly positive integer argument."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+@functools.lru_cache(maxsize=1)
 def create_parser() -> argparse.ArgumentParser:
-    """Create the argument parser."""
+    """Create the argument parser (built once and reused)."""
+    providers = tuple(list_providers())
     parser = argparse.ArgumentParser(
         prog="llmx",
         description="LLMX - A unified API for interacting with large language models",
@@ -26,7 +42,7 @@ def create_parser() -> argparse.ArgumentParser:
     chat_parser.add_argument(
         "--provider",
         required=True,
-        choices=list_providers(),
+        choices=providers,
         help="LLM provider to use",
     )
     chat_parser.add_argument("--model", help="Model to use (provider default if not specified)")
@@ -41,6 +57,11 @@ def create_parser() -> argparse.ArgumentParser:
     chat_parser.add_argument(
         "--stream", action="store_true", help="Stream the response"
     )
+    chat_parser.add_argument(
+        "--line-buffered",
+        action="store_true",
+        help="Flush every streamed chunk immediately (for piped consumers)",
+    )
     chat_parser.add_argument(
         "--no-cache", action="store_true", help="Disable caching"
     )
@@ -53,7 +74,7 @@ def create_parser() -> argparse.ArgumentParser:
     gen_parser.add_argument(
         "--provider",
         required=True,
-        choices=list_providers(),
+        choices=providers,
         help="LLM provider to use",
     )
     gen_parser.add_argument("--model", help="Model to use")
@@ -62,6 +83,11 @@ def create_parser() -> argparse.ArgumentParser:
     gen_parser.add_argument("--temperature", type=float, help="Sampling temperature")
     gen_parser.add_argument("--top-p", type=float, help="Top-p sampling parameter")
     gen_parser.add_argument("--stream", action="store_true", help="Stream the response")
+    gen_parser.add_argument(
+        "--line-buffered",
+        action="store_true",
+        help="Flush every streamed chunk immediately (for piped consumers)",
+    )
     gen_parser.add_argument("--no-cache", action="store_true", help="Disable caching")
     gen_parser.add_argument(
         "--async", dest="use_async", action="store_true", help="Use async mode"
@@ -74,9 +100,15 @@ def create_parser() -> argparse.ArgumentParser:
     test_parser = subparsers.add_parser("test", help="Test provider connectivity")
     test_parser.add_argument(
         "--provider",
-        choices=list_providers(),
+        choices=providers,
         help="Provider to test (tests all if not specified)",
     )
+    test_parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=4,
+        help="Maximum number of providers to test at once (default: 4)",
+    )
 
     return parser
 
@@ -89,6 +121,17 @@ def print_providers():
         print(f"  - {provider}")
 
 
+# Minimal request used to probe provider connectivity
+PROBE_MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def _print_provider_success(provider_name: str, response) -> None:
+    """Print the report for a provider that answered the probe."""
+    print(f"✓ {provider_name}: Connected successfully")
+    print(f"  Model: {response.model}")
+    print(f"  Response: {response.text[0].content[:50]}...")
+
+
 def test_provider(provider_name: str) -> bool:
     """Test a single provider."""
     try:
@@ -96,12 +139,9 @@ def test_provider(provider_name: str) -> bool:
         generator = llm(provider=provider_name)
 
         # Try a simple generation
-        messages = [{"role": "user", "content": "Hello"}]
-        response = generator.generate(messages, max_tokens=10)
+        response = generator.generate(PROBE_MESSAGES, max_tokens=10)
 
-        print(f"✓ {provider_name}: Connected successfully")
-        print(f"  Model: {response.model}")
-        print(f"  Response: {response.text[0].content[:50]}...")
+        _print_provider_success(provider_name, response)
         return True
 
     except Exception as e:
@@ -109,7 +149,38 @@ def test_provider(provider_name: str) -> bool:
         return False
 
 
-def test_providers(provider_name: Optional[str] = None):
+async def async_test_provider(provider_name: str, semaphore: asyncio.Semaphore) -> bool:
+    """Async version of test_provider, limited to ``semaphore`` concurrent probes.
+
+    The report is printed in one go once the probe completes, so reports from
+    concurrent probes never interleave.
+    """
+    try:
+        async with semaphore:
+            generator = llm(provider=provider_name)
+            response = await generator.async_generate(PROBE_MESSAGES, max_tokens=10)
+
+        _print_provider_success(provider_name, response)
+        passed = True
+
+    except Exception as e:
+        print(f"✗ {provider_name}: Failed - {e}")
+        passed = False
+
+    print()
+    return passed
+
+
+async def async_test_providers(providers: List[str], concurrency: int) -> int:
+    """Probe providers concurrently and return how many are working."""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(async_test_provider(provider, semaphore) for provider in providers)
+    )
+    return sum(results)
+
+
+def test_providers(provider_name: Optional[str] = None, concurrency: int = 4):
     """Test provider connectivity."""
     if provider_name:
         test_provider(provider_name)
@@ -118,25 +189,26 @@ def test_providers(provider_name: Optional[str] = None):
         print(f"Testing {len(providers)} providers...")
         print()
 
-        passed = 0
-        for provider in providers:
-            if test_provider(provider):
-                passed += 1
-            print()
+        # Results are printed as each probe finishes
+        passed = asyncio.run(async_test_providers(providers, concurrency))
 
         print(f"Results: {passed}/{len(providers)} providers working")
 
 
-async def async_chat_mode(generator, stream: bool = False):
+async def async_chat_mode(generator, stream: bool = False, line_buffered: bool = False):
     """Async interactive chat mode."""
+    from llmx.streaming import StreamAccumulator
+
     print("LLMX Chat (async mode) - Type 'quit' to exit")
     print("-" * 40)
 
     messages = []
+    loop = asyncio.get_running_loop()
 
     while True:
         try:
-            user_input = input("\nYou: ").strip()
+            # Read on a worker thread so the event loop keeps serving background tasks
+            user_input = (await loop.run_in_executor(None, input, "\nYou: ")).strip()
             if user_input.lower() in ["quit", "exit", "q"]:
                 break
 
@@ -148,29 +220,31 @@ async def async_chat_mode(generator, stream: bool = False):
             print("Assistant: ", end="", flush=True)
 
             if stream:
-                content = ""
+                content = StreamAccumulator()
+                writer = StreamWriter(line_buffered)
                 async for chunk in await generator.async_generate(messages, stream=True):
-                    print(chunk.content, end="", flush=True)
-                    content += chunk.content
+                    writer.write(content.add(chunk), chunk.done)
                     if chunk.done:
                         break
                 print()  # New line after streaming
-                messages.append({"role": "assistant", "content": content})
+                messages.append({"role": "assistant", "content": content.text})
             else:
                 response = await generator.async_generate(messages)
                 content = response.text[0].content
                 print(content)
                 messages.append({"role": "assistant", "content": content})
 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n\nGoodbye!")
             break
         except Exception as e:
             print(f"\nError: {e}")
 
 
-def chat_mode(generator, stream: bool = False):
+def chat_mode(generator, stream: bool = False, line_buffered: bool = False):
     """Interactive chat mode."""
+    from llmx.streaming import StreamAccumulator
+
     print("LLMX Chat - Type 'quit' to exit")
     print("-" * 30)
 
@@ -190,14 +264,14 @@ def chat_mode(generator, stream: bool = False):
             print("Assistant: ", end="", flush=True)
 
             if stream:
-                content = ""
+                content = StreamAccumulator()
+                writer = StreamWriter(line_buffered)
                 for chunk in generator.generate(messages, stream=True):
-                    print(chunk.content, end="", flush=True)
-                    content += chunk.content
+                    writer.write(content.add(chunk), chunk.done)
                     if chunk.done:
                         break
                 print()  # New line after streaming
-                messages.append({"role": "assistant", "content": content})
+                messages.append({"role": "assistant", "content": content.text})
             else:
                 response = generator.generate(messages)
                 content = response.text[0].content
@@ -211,13 +285,14 @@ def chat_mode(generator, stream: bool = False):
             print(f"\nError: {e}")
 
 
-async def async_single_prompt(generator, prompt: str, **kwargs):
+async def async_single_prompt(generator, prompt: str, line_buffered: bool = False, **kwargs):
     """Handle async single prompt."""
     messages = [{"role": "user", "content": prompt}]
 
     if kwargs.get("stream"):
+        writer = StreamWriter(line_buffered)
         async for chunk in await generator.async_generate(messages, **kwargs):
-            print(chunk.content, end="", flush=True)
+            writer.write(chunk.content, chunk.done)
             if chunk.done:
                 break
         print()  # New line after streaming
@@ -226,13 +301,14 @@ async def async_single_prompt(generator, prompt: str, **kwargs):
         print(response.text[0].content)
 
 
-def single_prompt(generator, prompt: str, **kwargs):
+def single_prompt(generator, prompt: str, line_buffered: bool = False, **kwargs):
     """Handle single prompt."""
     messages = [{"role": "user", "content": prompt}]
 
     if kwargs.get("stream"):
+        writer = StreamWriter(line_buffered)
         for chunk in generator.generate(messages, **kwargs):
-            print(chunk.content, end="", flush=True)
+            writer.write(chunk.content, chunk.done)
             if chunk.done:
                 break
         print()  # New line after streaming
@@ -255,7 +331,7 @@ def main():
             print_providers()
 
         elif args.command == "test":
-            test_providers(args.provider)
+            test_providers(args.provider, args.concurrency)
 
         elif args.command in ["chat", "generate"]:
             # Create generator
@@ -277,26 +353,32 @@ def main():
             if args.top_p is not None:
                 gen_kwargs["top_p"] = args.top_p
 
+            line_buffered = args.line_buffered
+
             if args.command == "generate":
                 # Single prompt mode
                 if args.use_async:
-                    asyncio.run(async_single_prompt(generator, args.prompt, **gen_kwargs))
+                    asyncio.run(
+                        async_single_prompt(generator, args.prompt, line_buffered, **gen_kwargs)
+                    )
                 else:
-                    single_prompt(generator, args.prompt, **gen_kwargs)
+                    single_prompt(generator, args.prompt, line_buffered, **gen_kwargs)
 
             else:  # chat command
                 if hasattr(args, "prompt") and args.prompt:
                     # Single prompt mode
                     if args.use_async:
-                        asyncio.run(async_single_prompt(generator, args.prompt, **gen_kwargs))
+                        asyncio.run(
+                            async_single_prompt(generator, args.prompt, line_buffered, **gen_kwargs)
+                        )
                     else:
-                        single_prompt(generator, args.prompt, **gen_kwargs)
+                        single_prompt(generator, args.prompt, line_buffered, **gen_kwargs)
                 else:
                     # Interactive mode
                     if args.use_async:
-                        asyncio.run(async_chat_mode(generator, args.stream))
+                        asyncio.run(async_chat_mode(generator, args.stream, line_buffered))
                     else:
-                        chat_mode(generator, args.stream)
+                        chat_mode(generator, args.stream, line_buffered)
 
     except LLMXError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -1,11 +1,36 @@
 """Core LLMX functionality."""
 
+import asyncio
+import functools
 import os
-from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Union
+import threading
+import time
+import warnings
+import weakref
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from llmx.cache import CacheManager
-from llmx.exceptions import ConfigurationError, ValidationError
-from llmx.providers import get_provider
+from llmx.cache import CacheManager, FlightAbandoned, KeyState
+from llmx.exceptions import (
+    BatchError,
+    CircuitOpenError,
+    ConfigurationError,
+    LLMXError,
+    ValidationError,
+)
+from llmx.providers import BaseProvider, get_provider, list_providers
 from llmx.types import (
     CacheConfig,
     GenerationConfig,
@@ -15,6 +40,164 @@ from llmx.types import (
     StreamChunk,
 )
 
+# Minimum number of conversations worth submitting as a batch job
+BATCH_MIN_SIZE = 16
+
+# Batch jobs complete within 24 hours
+BATCH_TIMEOUT = 24 * 60 * 60.0
+
+# Number of recent prompts whose normalized messages and cache keys are memoized
+PREPARED_CACHE_SIZE = 1024
+
+
+def _env_limit(name: str, default: int) -> int:
+    """Read a positive integer from the environment, warning and using ``default`` if invalid."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        # Raising here would break every import of llmx, including the CLI
+        warnings.warn(
+            f"Ignoring {name}={value!r}: expected a positive integer; using {default}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return default
+    return limit
+
+
+# Default limit on concurrent calls to each provider, per generator. Read once
+# at import, so deployments can tune it without code changes.
+MAX_CONCURRENT = _env_limit("LLMX_MAX_CONCURRENCY", 50)
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """
+    Fail fast on a provider that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls raise ``CircuitOpenError`` immediately. Once ``reset_timeout``
+    seconds have passed a single probe call is let through (half-open): its
+    success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Errors caused by the request rather than the provider don't count
+    IGNORED_ERRORS = (ConfigurationError, ValidationError)
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        # State changes never await, so one thread lock serves sync and async callers
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Call ``func`` through the breaker."""
+        self._before_call()
+        try:
+            result = func()
+        except BaseException as e:
+            self._on_error(e)
+            raise
+        self._on_success()
+        return result
+
+    async def async_call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Await ``func()`` through the breaker."""
+        self._before_call()
+        try:
+            result = await func()
+        except BaseException as e:
+            self._on_error(e)
+            raise
+        self._on_success()
+        return result
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                # Let this call through as the probe
+                self.state = self.HALF_OPEN
+                return
+
+        raise CircuitOpenError(
+            f"Circuit open for provider '{self.name}' after repeated failures",
+            provider=self.name,
+            retry_after=max(remaining, 0.0),
+        )
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failure_count = 0
+
+    def _on_error(self, error: BaseException) -> None:
+        with self._lock:
+            if isinstance(error, self.IGNORED_ERRORS) or not isinstance(error, Exception):
+                # Not the provider's fault; release a half-open probe slot
+                if self.state == self.HALF_OPEN:
+                    self.state = self.OPEN
+                    self.opened_at = time.monotonic() - self.reset_timeout
+                return
+
+            self.failure_count += 1
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class Bulkhead:
+    """
+    Cap the number of concurrent calls to one provider.
+
+    Callers beyond ``limit`` wait for a free slot, so a burst of requests
+    cannot exhaust the connection pool or trip the provider's rate limits.
+    Threads share one slot pool; each event loop gets its own, since asyncio
+    semaphores cannot be shared between loops.
+    """
+
+    def __init__(self, limit: int):
+        # A zero-slot bulkhead would make every call wait forever
+        if limit < 1:
+            raise ConfigurationError(f"max_concurrent must be at least 1, got {limit}")
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+        # Keyed by event loop
+        self._async_semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Call ``func`` once a slot is free."""
+        with self._semaphore:
+            return func()
+
+    async def async_call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Await ``func()`` once a slot is free."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.limit)
+        async with semaphore:
+            return await func()
+
 
 class LLMGenerator:
     """Main class for generating text using various LLM providers."""
@@ -30,6 +213,9 @@ class LLMGenerator:
         max_retries: int = 3,
         cache_config: Optional[CacheConfig] = None,
         fallback_providers: Optional[List[str]] = None,
+        coalesce: bool = True,
+        max_concurrent: Optional[int] = MAX_CONCURRENT,
+        warmup: bool = False,
     ):
         """
         Initialize the LLM generator.
@@ -44,9 +230,16 @@ class LLMGenerator:
             max_retries: Maximum number of retries
             cache_config: Cache configuration
             fallback_providers: List of fallback providers
+            coalesce: Share one provider call between identical cacheable
+                requests that are in flight at the same time
+            max_concurrent: Maximum concurrent calls to each provider (None for
+                no limit; defaults to $LLMX_MAX_CONCURRENCY or 50)
+            warmup: Open a connection to the provider in the background so the
+                first request skips connection setup
         """
         self.provider_name = provider
         self.fallback_providers = fallback_providers or []
+        self.coalesce = coalesce
 
         # Initialize provider config
         provider_config = ProviderConfig(
@@ -63,9 +256,45 @@ class LLMGenerator:
         # Initialize provider
         self.provider = get_provider(provider, provider_config)
 
+        if warmup:
+            self.provider.warmup()
+
         # Set default model
         self.default_model = model or self.provider.default_model
 
+        # Build fallback providers once; they reuse their pooled clients on every
+        # failure. Unknown names fail here, while providers that cannot be set
+        # up (e.g. missing API key) are skipped as before.
+        available = list_providers()
+        self._fallbacks: List[Tuple[str, BaseProvider]] = []
+        self._fallback_errors: Dict[str, LLMXError] = {}
+        for name in self.fallback_providers:
+            if name.lower() not in available:
+                raise ConfigurationError(
+                    f"Fallback provider '{name}' not supported. "
+                    f"Available providers: {', '.join(available)}"
+                )
+            try:
+                self._fallbacks.append((name, get_provider(name, provider_config)))
+            except LLMXError as e:
+                self._fallback_errors[name] = e
+
+        # Normalized messages and cache keys of recent prompts (see _prepare_cached)
+        self._prepared: "OrderedDict[tuple, Tuple[List[Message], KeyState, str]]" = OrderedDict()
+        self._prepared_lock = threading.Lock()
+
+        # One circuit breaker per provider, including fallbacks
+        self._breakers = {
+            name: CircuitBreaker(name) for name in [provider, *self.fallback_providers]
+        }
+
+        # Bulkheads keep a slow provider from tying up every caller
+        self._bulkheads: Dict[str, Bulkhead] = {}
+        if max_concurrent is not None:
+            self._bulkheads = {
+                name: Bulkhead(max_concurrent) for name in [provider, *self.fallback_providers]
+            }
+
     def generate(
         self,
         messages: List[Union[Message, Dict[str, str]]],
@@ -75,8 +304,13 @@ class LLMGenerator:
         top_p: Optional[float] = None,
         stream: bool = False,
         use_cache: bool = True,
+        previous_response: Optional[Response] = None,
+        coalesce_ms: float = 0,
+        batched: bool = False,
         **kwargs: Any,
-    ) -> Union[Response, Generator[StreamChunk, None, None]]:
+    ) -> Union[
+        Response, Generator[StreamChunk, None, None], Generator[List[StreamChunk], None, None]
+    ]:
         """
         Generate text using the configured provider.
 
@@ -88,14 +322,19 @@ class LLMGenerator:
             top_p: Top-p sampling parameter
             stream: Whether to stream the response
             use_cache: Whether to use caching
+            previous_response: Response to an earlier prefix of ``messages``;
+                cache-key hashing resumes from it instead of rehashing the
+                whole conversation
+            coalesce_ms: When streaming, merge chunks that arrive within this
+                many milliseconds into one chunk (0 yields every chunk)
+            batched: When streaming, yield lists of the chunks that arrived
+                together (in order) instead of single chunks; ``coalesce_ms``
+                is ignored
             **kwargs: Additional provider-specific arguments
 
         Returns:
             Response object or generator for streaming
         """
-        # Normalize messages
-        normalized_messages = self._normalize_messages(messages)
-
         # Create generation config
         config = GenerationConfig(
             model=model or self.default_model,
@@ -106,31 +345,65 @@ class LLMGenerator:
             use_cache=use_cache,
         )
 
+        # Skip hashing the conversation entirely when caching is off
+        use_cache = use_cache and self.cache.config.enabled
+
         # Check cache if enabled
+        key_state = None
         if use_cache and not stream:
-            cache_key = self.cache.get_cache_key(normalized_messages, config, self.provider_name)
+            normalized_messages, key_state, cache_key = self._prepare_cached(
+                messages, config, previous_response
+            )
             cached_response = self.cache.get(cache_key)
+            if cached_response is None and self._use_semantic(config):
+                cached_response = self.cache.semantic_get(
+                    normalized_messages, config, self.provider_name
+                )
             if cached_response:
-                cached_response.cached = True
+                cached_response = _as_cached(cached_response)
+                self._remember_state(cached_response, normalized_messages, key_state)
                 return cached_response
+        else:
+            normalized_messages = self._normalize_messages(messages)
 
         try:
             # Generate response
             if stream:
-                return self._generate_stream(normalized_messages, config, **kwargs)
+                if batched:
+                    return self._generate_stream_batched(normalized_messages, config, **kwargs)
+                return self._generate_stream(normalized_messages, config, coalesce_ms, **kwargs)
             else:
-                response = self.provider.generate(normalized_messages, config, **kwargs)
-
-                # Cache response if enabled
-                if use_cache:
+                if not use_cache:
+                    return self._call_provider(
+                        self.provider_name,
+                        lambda: self.provider.generate(normalized_messages, config, **kwargs),
+                    )
+
+                # Share the response of an identical request that is already in flight
+                with self.cache.track_inflight(cache_key, self.coalesce) as flight:
+                    if not flight.leader:
+                        return flight.future.result()
+
+                    response = self._call_provider(
+                        self.provider_name,
+                        lambda: self.provider.generate(normalized_messages, config, **kwargs),
+                    )
+
+                    # Cache response
                     self.cache.set(cache_key, response)
+                    if self._use_semantic(config):
+                        self.cache.semantic_add(
+                            cache_key, normalized_messages, config, self.provider_name
+                        )
+                    self._remember_state(response, normalized_messages, key_state)
+                    flight.future.set_result(response)
 
                 return response
 
         except Exception as e:
             # Try fallback providers
             if self.fallback_providers:
-                return self._try_fallback(normalized_messages, config, **kwargs)
+                return self._try_fallback(normalized_messages, config, key_state, **kwargs)
             raise
 
     async def async_generate(
@@ -142,8 +415,13 @@ class LLMGenerator:
         top_p: Optional[float] = None,
         stream: bool = False,
         use_cache: bool = True,
+        previous_response: Optional[Response] = None,
+        coalesce_ms: float = 0,
+        batched: bool = False,
         **kwargs: Any,
-    ) -> Union[Response, AsyncGenerator[StreamChunk, None]]:
+    ) -> Union[
+        Response, AsyncGenerator[StreamChunk, None], AsyncGenerator[List[StreamChunk], None]
+    ]:
         """
         Async version of generate.
 
@@ -155,14 +433,19 @@ class LLMGenerator:
             top_p: Top-p sampling parameter
             stream: Whether to stream the response
             use_cache: Whether to use caching
+            previous_response: Response to an earlier prefix of ``messages``;
+                cache-key hashing resumes from it instead of rehashing the
+                whole conversation
+            coalesce_ms: When streaming, merge chunks that arrive within this
+                many milliseconds into one chunk (0 yields every chunk)
+            batched: When streaming, yield lists of the chunks that arrived
+                together (in order) instead of single chunks; ``coalesce_ms``
+                is ignored
             **kwargs: Additional provider-specific arguments
 
         Returns:
             Response object or async generator for streaming
         """
-        # Normalize messages
-        normalized_messages = self._normalize_messages(messages)
-
         # Create generation config
         config = GenerationConfig(
             model=model or self.default_model,
@@ -173,83 +456,471 @@ class LLMGenerator:
             use_cache=use_cache,
         )
 
+        # Skip hashing the conversation entirely when caching is off
+        use_cache = use_cache and self.cache.config.enabled
+
         # Check cache if enabled
+        key_state = None
         if use_cache and not stream:
-            cache_key = self.cache.get_cache_key(normalized_messages, config, self.provider_name)
+            normalized_messages, key_state, cache_key = self._prepare_cached(
+                messages, config, previous_response
+            )
             cached_response = await self.cache.async_get(cache_key)
+            if cached_response is None and self._use_semantic(config):
+                # Embedding the prompt is CPU-bound; keep it off the event loop
+                cached_response = await asyncio.get_running_loop().run_in_executor(
+                    None, self.cache.semantic_get, normalized_messages, config, self.provider_name
+                )
             if cached_response:
-                cached_response.cached = True
+                cached_response = _as_cached(cached_response)
+                self._remember_state(cached_response, normalized_messages, key_state)
                 return cached_response
+        else:
+            normalized_messages = self._normalize_messages(messages)
 
         try:
             # Generate response
             if stream:
-                return self._async_generate_stream(normalized_messages, config, **kwargs)
+                if batched:
+                    return self._async_generate_stream_batched(
+                        normalized_messages, config, **kwargs
+                    )
+                return self._async_generate_stream(
+                    normalized_messages, config, coalesce_ms, **kwargs
+                )
             else:
-                response = await self.provider.async_generate(normalized_messages, config, **kwargs)
-
-                # Cache response if enabled
-                if use_cache:
-                    await self.cache.async_set(cache_key, response)
-
-                return response
+                if not use_cache:
+                    return await self._async_call_provider(
+                        self.provider_name,
+                        lambda: self.provider.async_generate(normalized_messages, config, **kwargs),
+                    )
+
+                # Share the response of an identical request that is already in flight
+                while True:
+                    async with self.cache.async_track_inflight(cache_key, self.coalesce) as flight:
+                        if not flight.leader:
+                            try:
+                                return await asyncio.shield(flight.future)
+                            except FlightAbandoned:
+                                # The leader was cancelled; retry, possibly as the new leader
+                                continue
+
+                        response = await self._async_call_provider(
+                            self.provider_name,
+                            lambda: self.provider.async_generate(
+                                normalized_messages, config, **kwargs
+                            ),
+                        )
+
+                        # Cache response
+                        await self.cache.async_set(cache_key, response)
+                        if self._use_semantic(config):
+                            await asyncio.get_running_loop().run_in_executor(
+                                None,
+                                self.cache.semantic_add,
+                                cache_key,
+                                normalized_messages,
+                                config,
+                                self.provider_name,
+                            )
+                        self._remember_state(response, normalized_messages, key_state)
+                        flight.future.set_result(response)
+
+                    return response
 
         except Exception as e:
             # Try fallback providers
             if self.fallback_providers:
-                return await self._async_try_fallback(normalized_messages, config, **kwargs)
+                return await self._async_try_fallback(
+                    normalized_messages, config, key_state, **kwargs
+                )
             raise
 
+    async def batch_generate(
+        self,
+        messages_list: List[List[Union[Message, Dict[str, str]]]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        use_cache: bool = True,
+        use_batch_api: bool = True,
+        batch_timeout: float = BATCH_TIMEOUT,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> List[Response]:
+        """
+        Generate responses for many independent conversations.
+
+        Large workloads on providers with a batch API (OpenAI) are submitted as
+        one batch job, which is cheaper but may take minutes to hours; anything
+        else runs as concurrent ``async_generate`` calls.
+
+        A batch job goes through the provider's circuit breaker and bulkhead
+        (holding one slot while it runs) but is not retried on the fallback
+        providers. If some of its requests fail, ``BatchError`` is raised with
+        every available response in ``results``; the successful ones are
+        cached first, so calling again only resubmits the failures.
+
+        Args:
+            messages_list: One list of messages per conversation
+            model: Model to use (overrides default)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            top_p: Top-p sampling parameter
+            use_cache: Whether to use caching
+            use_batch_api: Whether to use the provider's batch API when eligible
+            batch_timeout: Seconds to wait for a batch job to finish
+            max_concurrency: Maximum concurrent requests when not batching
+            **kwargs: Additional provider-specific arguments
+
+        Returns:
+            Responses in the order of ``messages_list``
+        """
+        normalized = [self._normalize_messages(messages) for messages in messages_list]
+        config = GenerationConfig(
+            model=model or self.default_model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            use_cache=use_cache,
+        )
+
+        batch = use_batch_api and self.provider.supports_batch and len(normalized) >= BATCH_MIN_SIZE
+        if not batch:
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def run(messages: List[Message]) -> Response:
+                async with semaphore:
+                    return await self.async_generate(
+                        messages,
+                        model=config.model,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        top_p=top_p,
+                        use_cache=use_cache,
+                        **kwargs,
+                    )
+
+            return list(await asyncio.gather(*(run(messages) for messages in normalized)))
+
+        def submit(conversations: List[List[Message]]) -> Awaitable[List[Response]]:
+            return self._async_call_provider(
+                self.provider_name,
+                lambda: self.provider.async_batch_generate(
+                    conversations, config, batch_timeout, **kwargs
+                ),
+            )
+
+        use_cache = use_cache and self.cache.config.enabled
+        if not use_cache:
+            return await submit(normalized)
+
+        # Only submit the conversations that are not cached yet
+        keys = [self.cache.get_cache_key(m, config, self.provider_name) for m in normalized]
+        results = [
+            None if response is None else _as_cached(response)
+            for response in await self.cache.async_mget(keys)
+        ]
+
+        missing = [i for i, response in enumerate(results) if response is None]
+        if missing:
+            error = None
+            try:
+                responses = await submit([normalized[i] for i in missing])
+            except BatchError as e:
+                responses, error = e.results, e
+            for i, response in zip(missing, responses):
+                results[i] = response
+            await self.cache.async_mset(
+                {keys[i]: results[i] for i in missing if results[i] is not None}
+            )
+            if error is not None:
+                # Report failures against this call's conversations, not the submitted subset
+                raise BatchError(str(error), provider=error.provider, results=results) from error
+
+        return results
+
+    def close(self) -> None:
+        """Close the sync clients of the provider and its fallbacks."""
+        for provider in self._providers():
+            provider.close()
+
+    async def aclose(self) -> None:
+        """Close the sync and async clients of the provider and its fallbacks."""
+        for provider in self._providers():
+            await provider.aclose()
+
+    def __enter__(self) -> "LLMGenerator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "LLMGenerator":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _call_provider(self, name: str, func: Callable[[], T]) -> T:
+        """Call ``func`` through the circuit breaker and bulkhead of provider ``name``."""
+        bulkhead = self._bulkheads.get(name)
+        if bulkhead is None:
+            return self._breakers[name].call(func)
+        return self._breakers[name].call(lambda: bulkhead.call(func))
+
+    async def _async_call_provider(self, name: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Async version of _call_provider."""
+        bulkhead = self._bulkheads.get(name)
+        if bulkhead is None:
+            return await self._breakers[name].async_call(func)
+        return await self._breakers[name].async_call(lambda: bulkhead.async_call(func))
+
+    def _use_semantic(self, config: GenerationConfig) -> bool:
+        """Whether to use the semantic cache tier for a request.
+
+        Only deterministic (temperature unset or 0) requests are matched by
+        similarity, since sampled responses are not meant to be reused.
+        """
+        return self.cache.config.semantic and not config.temperature
+
+    def _providers(self) -> List[BaseProvider]:
+        """The primary provider followed by the fallbacks."""
+        return [self.provider, *(fallback for _, fallback in self._fallbacks)]
+
+    def _prepare_cached(
+        self,
+        messages: List[Union[Message, Dict[str, str]]],
+        config: GenerationConfig,
+        previous_response: Optional[Response],
+    ) -> Tuple[List[Message], KeyState, str]:
+        """
+        Normalize messages and compute their cache key, memoized per prompt.
+
+        Repeated identical prompts (evals, tests, agent loops) skip both
+        message validation and hashing. The memo is keyed on the message
+        roles and contents plus the sampling parameters that enter the key;
+        prompts that cannot be fingerprinted are prepared without it.
+        """
+        fingerprint = _fingerprint(messages)
+        memo_key = None
+        if fingerprint is not None:
+            params = (config.model, config.max_tokens, config.temperature, config.top_p)
+            memo_key = (fingerprint, params)
+            with self._prepared_lock:
+                prepared = self._prepared.get(memo_key)
+                if prepared is not None:
+                    self._prepared.move_to_end(memo_key)
+                    return prepared
+
+        normalized = self._normalize_messages(messages)
+        key_state = self.cache.message_state(
+            normalized, self._resume_state(normalized, previous_response)
+        )
+        prepared = (
+            normalized,
+            key_state,
+            self.cache.get_cache_key_from_state(key_state, config, self.provider_name),
+        )
+
+        if memo_key is not None:
+            with self._prepared_lock:
+                self._prepared[memo_key] = prepared
+                if len(self._prepared) > PREPARED_CACHE_SIZE:
+                    self._prepared.popitem(last=False)
+        return prepared
+
     def _normalize_messages(self, messages: List[Union[Message, Dict[str, str]]]) -> List[Message]:
         """Normalize messages to Message objects."""
         normalized = []
         for msg in messages:
-            if isinstance(msg, dict):
-                normalized.append(Message(**msg))
-            elif isinstance(msg, Message):
+            # Message objects are already validated (and frozen); pass them through
+            if isinstance(msg, Message):
                 normalized.append(msg)
+            elif isinstance(msg, dict):
+                normalized.append(Message(**msg))
             else:
                 raise ValidationError(f"Invalid message type: {type(msg)}")
         return normalized
 
+    def _resume_state(
+        self, messages: List[Message], previous_response: Optional[Response]
+    ) -> Optional[KeyState]:
+        """Get the key state of ``previous_response`` if ``messages`` continue its conversation."""
+        if previous_response is None or not previous_response.text:
+            return None
+
+        state = previous_response._cache_state
+        if state is None or len(messages) <= state.count:
+            return None
+
+        # The state ends with the previous reply; make sure the caller sent it back unchanged
+        reply = messages[state.count - 1]
+        if reply.role != "assistant" or reply.content != previous_response.text[0].content:
+            return None
+        return state
+
+    def _remember_state(
+        self, response: Response, messages: List[Message], state: KeyState
+    ) -> None:
+        """Attach the key state of ``messages`` plus the reply to ``response``."""
+        if response.text:
+            reply = Message(role="assistant", content=response.text[0].content)
+            response._cache_state = self.cache.message_state(messages + [reply], state)
+
     def _generate_stream(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+        self,
+        messages: List[Message],
+        config: GenerationConfig,
+        coalesce_ms: float = 0,
+        **kwargs: Any,
     ) -> Generator[StreamChunk, None, None]:
         """Generate streaming response."""
-        yield from self.provider.generate_stream(messages, config, **kwargs)
+        chunks = self.provider.generate_stream(messages, config, **kwargs)
+        if coalesce_ms <= 0:
+            yield from chunks
+            return
+
+        window = coalesce_ms / 1000
+        buffer: List[StreamChunk] = []
+        deadline = 0.0
+        for chunk in chunks:
+            if not buffer:
+                deadline = time.monotonic() + window
+            buffer.append(chunk)
+            if chunk.done or time.monotonic() >= deadline:
+                yield _merge_chunks(buffer)
+                buffer = []
+        if buffer:
+            yield _merge_chunks(buffer)
 
     async def _async_generate_stream(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+        self,
+        messages: List[Message],
+        config: GenerationConfig,
+        coalesce_ms: float = 0,
+        **kwargs: Any,
     ) -> AsyncGenerator[StreamChunk, None]:
         """Generate async streaming response."""
-        async for chunk in self.provider.async_generate_stream(messages, config, **kwargs):
-            yield chunk
+        chunks = self.provider.async_generate_stream(messages, config, **kwargs)
+        if coalesce_ms <= 0:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        window = coalesce_ms / 1000
+        buffer: List[StreamChunk] = []
+        deadline = 0.0
+        async for chunk in chunks:
+            if not buffer:
+                deadline = time.monotonic() + window
+            buffer.append(chunk)
+            if chunk.done or time.monotonic() >= deadline:
+                yield _merge_chunks(buffer)
+                buffer = []
+        if buffer:
+            yield _merge_chunks(buffer)
+
+    def _generate_stream_batched(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Generator[List[StreamChunk], None, None]:
+        """Generate streaming response in batches of already-received chunks."""
+        yield from self.provider.generate_stream_batches(messages, config, **kwargs)
 
-    def _try_fallback(
+    async def _async_generate_stream_batched(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> AsyncGenerator[List[StreamChunk], None]:
+        """Generate async streaming response in batches of already-received chunks."""
+        async for batch in self.provider.async_generate_stream_batches(messages, config, **kwargs):
+            yield batch
+
+    def _try_fallback(
+        self,
+        messages: List[Message],
+        config: GenerationConfig,
+        key_state: Optional[KeyState] = None,
+        **kwargs: Any,
     ) -> Response:
-        """Try fallback providers."""
-        for fallback_provider in self.fallback_providers:
+        """Try fallback providers, using their cached responses when available."""
+        for name, fallback in self._fallbacks:
+            cache_key = None
+            if key_state is not None:
+                cache_key = self.cache.get_cache_key_from_state(key_state, config, name)
+                cached_response = self.cache.get(cache_key)
+                if cached_response:
+                    return _as_cached(cached_response)
             try:
-                fallback = get_provider(fallback_provider, self.provider.config)
-                return fallback.generate(messages, config, **kwargs)
+                response = self._call_provider(
+                    name, functools.partial(fallback.generate, messages, config, **kwargs)
+                )
             except Exception:
                 continue
+            if cache_key is not None:
+                self.cache.set(cache_key, response)
+            return response
         raise
 
     async def _async_try_fallback(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+        self,
+        messages: List[Message],
+        config: GenerationConfig,
+        key_state: Optional[KeyState] = None,
+        **kwargs: Any,
     ) -> Response:
-        """Try fallback providers asynchronously."""
-        for fallback_provider in self.fallback_providers:
+        """Try fallback providers asynchronously, using their cached responses when available."""
+        for name, fallback in self._fallbacks:
+            cache_key = None
+            if key_state is not None:
+                cache_key = self.cache.get_cache_key_from_state(key_state, config, name)
+                cached_response = await self.cache.async_get(cache_key)
+                if cached_response:
+                    return _as_cached(cached_response)
             try:
-                fallback = get_provider(fallback_provider, self.provider.config)
-                return await fallback.async_generate(messages, config, **kwargs)
+                response = await self._async_call_provider(
+                    name, functools.partial(fallback.async_generate, messages, config, **kwargs)
+                )
             except Exception:
                 continue
+            if cache_key is not None:
+                await self.cache.async_set(cache_key, response)
+            return response
         raise
 
 
+def _fingerprint(messages: List[Union[Message, Dict[str, str]]]) -> Optional[tuple]:
+    """Get a hashable (role, content) tuple for messages, or None if not possible."""
+    try:
+        fingerprint = tuple(
+            (msg.role, msg.content)
+            if isinstance(msg, Message)
+            else (msg["role"], msg["content"])
+            for msg in messages
+        )
+        hash(fingerprint)
+    except (KeyError, TypeError):
+        # Malformed or unhashable input; normalization reports the error
+        return None
+    return fingerprint
+
+
+def _as_cached(response: Response) -> Response:
+    """Get a copy of a cache hit flagged as cached; the stored response is frozen."""
+    return response if response.cached else response.model_copy(update={"cached": True})
+
+
+def _merge_chunks(chunks: List[StreamChunk]) -> StreamChunk:
+    """Merge consecutive stream chunks into one."""
+    if len(chunks) == 1:
+        return chunks[0]
+    last = chunks[-1]
+    return StreamChunk(
+        content="".join(chunk.content for chunk in chunks),
+        finish_reason=last.finish_reason,
+        done=last.done,
+    )
+
+
 def llm(
     provider: str,
     model: Optional[str] = None,
@@ -260,6 +931,9 @@ def llm(
     max_retries: int = 3,
     cache_config: Optional[CacheConfig] = None,
     fallback_providers: Optional[List[str]] = None,
+    coalesce: bool = True,
+    max_concurrent: Optional[int] = MAX_CONCURRENT,
+    warmup: bool = False,
 ) -> LLMGenerator:
     """
     Create an LLM generator instance.
@@ -274,6 +948,12 @@ def llm(
         max_retries: Maximum number of retries
         cache_config: Cache configuration
         fallback_providers: List of fallback providers
+        coalesce: Share one provider call between identical cacheable
+            requests that are in flight at the same time
+        max_concurrent: Maximum concurrent calls to each provider (None for
+            no limit; defaults to $LLMX_MAX_CONCURRENCY or 50)
+        warmup: Open a connection to the provider in the background so the
+            first request skips connection setup
 
     Returns:
         LLMGenerator instance
@@ -295,4 +975,7 @@ def llm(
         max_retries=max_retries,
         cache_config=cache_config,
         fallback_providers=fallback_providers,
+        coalesce=coalesce,
+        max_concurrent=max_concurrent,
+        warmup=warmup,
     )
\ No newline at end of file
@@ -37,6 +37,32 @@ class RateLimitError(ProviderError):
         self.retry_after = retry_after
 
 
+class CircuitOpenError(ProviderError):
+    """Raised when calls to a provider are suspended after repeated failures."""
+
+    def __init__(
+        self,
+        message: str = "Circuit breaker is open",
+        provider: str = None,
+        retry_after: float = None,
+    ):
+        super().__init__(message, provider, 503)
+        self.retry_after = retry_after
+
+
+class BatchError(ProviderError):
+    """Raised when some requests of a batch job fail.
+
+    ``results`` holds the responses in request order, with None for each
+    failed request; ``failed`` lists the indices of those requests.
+    """
+
+    def __init__(self, message: str, provider: str = None, results: list = None):
+        super().__init__(message, provider)
+        self.results = results or []
+        self.failed = [i for i, result in enumerate(self.results) if result is None]
+
+
 class ValidationError(LLMXError):
     """Raised when input validation fails."""
 
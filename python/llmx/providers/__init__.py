@@ -1,26 +1,63 @@
 """Provider implementations for LLMX."""
 
+import functools
+import importlib
+import types
+from typing import TYPE_CHECKING, Any, List, Type
+
+from llmx.providers._http_pool import ashutdown, shutdown
 from llmx.providers.base import BaseProvider
-from llmx.providers.openai import OpenAIProvider
-from llmx.providers.claude import ClaudeProvider
-from llmx.providers.grok import GrokProvider
-from llmx.providers.cohere import CohereProvider
-from llmx.providers.huggingface import HuggingFaceProvider
 from llmx.exceptions import ConfigurationError
 from llmx.types import ProviderConfig
 
+if TYPE_CHECKING:
+    from llmx.providers.claude import ClaudeProvider
+    from llmx.providers.cohere import CohereProvider
+    from llmx.providers.grok import GrokProvider
+    from llmx.providers.huggingface import HuggingFaceProvider
+    from llmx.providers.openai import OpenAIProvider
+
+# Provider classes as "module:class" paths; each module is imported on first use
+_PROVIDERS = types.MappingProxyType(
+    {
+        "openai": "llmx.providers.openai:OpenAIProvider",
+        "azure": "llmx.providers.openai:OpenAIProvider",  # Azure uses OpenAI-compatible API
+        "claude": "llmx.providers.claude:ClaudeProvider",
+        "anthropic": "llmx.providers.claude:ClaudeProvider",  # Alias for Claude
+        "grok": "llmx.providers.grok:GrokProvider",
+        "xai": "llmx.providers.grok:GrokProvider",  # Alias for Grok
+        "cohere": "llmx.providers.cohere:CohereProvider",
+        "huggingface": "llmx.providers.huggingface:HuggingFaceProvider",
+        "hf": "llmx.providers.huggingface:HuggingFaceProvider",  # Alias for HuggingFace
+    }
+)
+
+# Provider classes exposed as module attributes (see __getattr__)
+_CLASSES = types.MappingProxyType({path.partition(":")[2]: path for path in _PROVIDERS.values()})
+
+
+def _load(path: str) -> Type[BaseProvider]:
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
 
-_PROVIDERS = {
-    "openai": OpenAIProvider,
-    "azure": OpenAIProvider,  # Azure uses OpenAI-compatible API
-    "claude": ClaudeProvider,
-    "anthropic": ClaudeProvider,  # Alias for Claude
-    "grok": GrokProvider,
-    "xai": GrokProvider,  # Alias for Grok
-    "cohere": CohereProvider,
-    "huggingface": HuggingFaceProvider,
-    "hf": HuggingFaceProvider,  # Alias for HuggingFace
-}
+@functools.lru_cache(maxsize=32)
+def _resolve(provider_name: str) -> Type[BaseProvider]:
+    """Look up a provider class by name, ignoring case (raises KeyError)."""
+    return _load(_PROVIDERS[provider_name.lower()])
+
+
+def __getattr__(name: str) -> Any:
+    path = _CLASSES.get(name)
+    if path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _load(path)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_CLASSES))
 
 
 def get_provider(provider_name: str, config: ProviderConfig) -> BaseProvider:
@@ -37,15 +74,14 @@ def get_provider(provider_name: str, config: ProviderConfig) -> BaseProvider:
     Raises:
         ConfigurationError: If provider is not supported
     """
-    provider_name = provider_name.lower()
-
-    if provider_name not in _PROVIDERS:
+    try:
+        provider_class = _resolve(provider_name)
+    except KeyError:
         available = ", ".join(_PROVIDERS.keys())
         raise ConfigurationError(
-            f"Provider '{provider_name}' not supported. Available providers: {available}"
-        )
+            f"Provider '{provider_name.lower()}' not supported. Available providers: {available}"
+        ) from None
 
-    provider_class = _PROVIDERS[provider_name]
     return provider_class(config)
 
 
@@ -63,4 +99,6 @@ __all__ = [
     "HuggingFaceProvider",
     "get_provider",
     "list_providers",
+    "shutdown",
+    "ashutdown",
 ]
\ No newline at end of file
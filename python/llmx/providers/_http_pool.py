@@ -0,0 +1,127 @@
+"""Shared HTTP connection pools for LLMX providers."""
+
+import asyncio
+import atexit
+import importlib.util
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+# Connection limits for the process-wide pools, shared by every provider and
+# generator. Each generator may run 50 calls per provider at once (see
+# LLMGenerator max_concurrent), so the pool allows several generators' worth
+# of connections and keeps up to 100 of them warm. Idle connections are kept
+# for three minutes (httpx defaults to 5s) so that bursts separated by short
+# pauses reuse them instead of paying for new TLS handshakes.
+POOL_LIMITS = httpx.Limits(
+    max_connections=200, max_keepalive_connections=100, keepalive_expiry=180.0
+)
+
+# Multiplex concurrent requests (and streams) to a host over one connection.
+# h2 comes with the httpx[http2] dependency; without it, fall back to HTTP/1.1
+# rather than failing on the first request.
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Fail fast on unreachable endpoints; reads keep the provider timeout
+CONNECT_TIMEOUT = 5.0
+
+# Skip warming a pool that opened a connection to the same host this recently
+WARMUP_INTERVAL = 70.0
+
+_lock = threading.Lock()
+_warmed: Dict[Tuple[str, Optional[int]], float] = {}
+_transport: Optional[httpx.HTTPTransport] = None
+# asyncio connections cannot outlive their event loop, so each loop gets its own pool
+_async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_transport() -> httpx.HTTPTransport:
+    return httpx.HTTPTransport(http2=HTTP2, limits=POOL_LIMITS)
+
+
+def _new_async_transport() -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(http2=HTTP2, limits=POOL_LIMITS)
+
+
+class SharedTransport(httpx.BaseTransport):
+    """Sends requests through the process-wide connection pool.
+
+    Closing a client that uses this transport leaves the pool open for the
+    other clients; the pool itself is closed at interpreter exit.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        global _transport
+        if _transport is None:
+            with _lock:
+                if _transport is None:
+                    _transport = _new_transport()
+        return _transport.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class SharedAsyncTransport(httpx.AsyncBaseTransport):
+    """Sends requests through the connection pool of the running event loop."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        transport = _async_transports.get(loop)
+        if transport is None:
+            transport = _async_transports[loop] = _new_async_transport()
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def claim_warmup(url: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+    """
+    Record a warmup of ``url``'s host in the sync pool (or ``loop``'s pool).
+
+    Returns False if that pool was warmed for the host within WARMUP_INTERVAL.
+    """
+    key = (str(httpx.URL(url).copy_with(path="/", query=None)), id(loop) if loop else None)
+    now = time.monotonic()
+    with _lock:
+        if now - _warmed.get(key, -WARMUP_INTERVAL) < WARMUP_INTERVAL:
+            return False
+        _warmed[key] = now
+    return True
+
+
+def close() -> None:
+    """Close the shared synchronous pool."""
+    global _transport
+    with _lock:
+        transport, _transport = _transport, None
+    if transport is not None:
+        transport.close()
+
+
+def shutdown() -> None:
+    """
+    Close the synchronous pool and forget the async ones.
+
+    The pools are recreated on the next request. Async pools can only be
+    closed from their own event loop, see ``ashutdown``.
+    """
+    close()
+    _async_transports.clear()
+
+
+async def ashutdown() -> None:
+    """Close the synchronous pool and the pool of the running event loop."""
+    close()
+    transport = _async_transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.aclose()
+
+
+atexit.register(close)
@@ -0,0 +1,189 @@
+"""Server-sent events and JSON lines parsing for LLMX providers."""
+
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+_DATA = b"data:"
+_DATA_SPACE = b"data: "
+
+# Data payload that ends OpenAI-style streams
+DONE = b"[DONE]"
+
+# Bytes of consumed input kept at the front of a buffer before it is compacted
+_COMPACT_AT = 64 * 1024
+
+
+def _next_boundary(buf: bytearray, pos: int) -> Optional[tuple]:
+    """Find the first blank line after ``pos`` as (event end, next event start)."""
+    lf = buf.find(b"\n\n", pos)
+    # Only look for CRLF before the first LF boundary, so LF-only streams don't
+    # rescan the rest of the buffer for every event
+    crlf = buf.find(b"\n\r\n", pos, len(buf) if lf == -1 else lf + 2)
+    if crlf != -1:
+        return crlf, crlf + 3
+    if lf != -1:
+        return lf, lf + 2
+    return None
+
+
+def _event_data(event: bytes) -> Optional[bytes]:
+    """Get the data payload of one event, or None if it has no data lines."""
+    # Most providers send one "data: ..." line per event
+    if event.startswith(_DATA_SPACE) and b"\n" not in event:
+        return event[len(_DATA_SPACE):].rstrip(b"\r")
+
+    data: List[bytes] = []
+    for line in event.split(b"\n"):
+        # The space after the colon is optional and not part of the data
+        if line.startswith(_DATA_SPACE):
+            data.append(line[len(_DATA_SPACE):].rstrip(b"\r"))
+        elif line.startswith(_DATA):
+            data.append(line[len(_DATA):].rstrip(b"\r"))
+    if not data:
+        return None
+    return data[0] if len(data) == 1 else b"\n".join(data)
+
+
+class _EventBuffer:
+    """Accumulate raw bytes and split them into complete events."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        # Start of the first unconsumed event, and where the search for its end
+        # resumes, so an event spread over many reads is scanned only once
+        self._start = 0
+        self._scan = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add bytes and return the data of the events they complete."""
+        buf = self._buf
+        buf.extend(chunk)
+        events = []
+        pos = self._start
+        scan = self._scan
+        while True:
+            boundary = _next_boundary(buf, scan)
+            if boundary is None:
+                break
+            end, next_pos = boundary
+            data = _event_data(bytes(buf[pos:end]))
+            pos = scan = next_pos
+            if data is not None:
+                events.append(data)
+        # A blank line (up to 3 bytes) may straddle this read and the next
+        scan = max(pos, len(buf) - 2)
+        if pos > _COMPACT_AT:
+            # Drop consumed events only now and then, not on every read
+            del buf[:pos]
+            scan -= pos
+            pos = 0
+        self._start = pos
+        self._scan = scan
+        return events
+
+    def close(self) -> List[bytes]:
+        """Return the data of an unterminated final event, if any."""
+        rest = bytes(self._buf[self._start:])
+        self._buf.clear()
+        self._start = self._scan = 0
+        data = _event_data(rest) if rest.strip() else None
+        return [data] if data is not None else []
+
+
+class _LineBuffer:
+    """Accumulate raw bytes and split them into complete non-empty lines."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        # Start of the first unconsumed line, and where the search for its end resumes
+        self._start = 0
+        self._scan = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add bytes and return the lines they complete."""
+        buf = self._buf
+        buf.extend(chunk)
+        lines = []
+        pos = self._start
+        scan = self._scan
+        while True:
+            end = buf.find(b"\n", scan)
+            if end == -1:
+                break
+            line = bytes(buf[pos:end]).rstrip(b"\r")
+            pos = scan = end + 1
+            if line:
+                lines.append(line)
+        scan = len(buf)
+        if pos > _COMPACT_AT:
+            del buf[:pos]
+            scan -= pos
+            pos = 0
+        self._start = pos
+        self._scan = scan
+        return lines
+
+    def close(self) -> List[bytes]:
+        """Return an unterminated final line, if any."""
+        line = bytes(self._buf[self._start:]).strip()
+        self._buf.clear()
+        self._start = self._scan = 0
+        return [line] if line else []
+
+
+def iter_sse_batches(chunks: Iterable[bytes]) -> Iterator[List[bytes]]:
+    """Yield the data payloads of a byte stream, grouped by the read that completed them.
+
+    Events that arrive in the same network read are returned together, in
+    stream order, so callers can handle a burst of events at once.
+    """
+    events = _EventBuffer()
+    for chunk in chunks:
+        batch = events.feed(chunk)
+        if batch:
+            yield batch
+    batch = events.close()
+    if batch:
+        yield batch
+
+
+async def aiter_sse_batches(chunks: AsyncIterable[bytes]) -> AsyncIterator[List[bytes]]:
+    """Async version of iter_sse_batches."""
+    events = _EventBuffer()
+    async for chunk in chunks:
+        batch = events.feed(chunk)
+        if batch:
+            yield batch
+    batch = events.close()
+    if batch:
+        yield batch
+
+
+def iter_sse_data(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield the data payload of each event in a byte stream."""
+    for batch in iter_sse_batches(chunks):
+        yield from batch
+
+
+async def aiter_sse_data(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Async version of iter_sse_data."""
+    async for batch in aiter_sse_batches(chunks):
+        for data in batch:
+            yield data
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield the non-empty lines of a byte stream, e.g. newline-delimited JSON."""
+    lines = _LineBuffer()
+    for chunk in chunks:
+        yield from lines.feed(chunk)
+    yield from lines.close()
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Async version of iter_lines."""
+    lines = _LineBuffer()
+    async for chunk in chunks:
+        for line in lines.feed(chunk):
+            yield line
+    for line in lines.close():
+        yield line
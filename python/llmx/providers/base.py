@@ -1,10 +1,39 @@
 """Base provider class for LLMX."""
 
+import asyncio
+import functools
 import os
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+from email.utils import parsedate_to_datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Generator,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import httpx
+import orjson
 
-from llmx.exceptions import AuthenticationError, ConfigurationError
+from llmx.exceptions import AuthenticationError, ConfigurationError, ProviderError, RateLimitError
+from llmx.providers._http_pool import (
+    CONNECT_TIMEOUT,
+    SharedAsyncTransport,
+    SharedTransport,
+    claim_warmup,
+)
 from llmx.types import (
     GenerationConfig,
     Message,
@@ -13,26 +42,107 @@ from llmx.types import (
     StreamChunk,
 )
 
+# Timeout of the background request that opens a pooled connection
+WARMUP_TIMEOUT = 3.0
+
+# Running warmup tasks. The event loop only keeps weak references to tasks, so
+# these are held here until they finish, even if the caller drops the task.
+_warmup_tasks: Set["asyncio.Task"] = set()
+
+# Longest server-requested Retry-After delay honoured between attempts
+MAX_RETRY_AFTER = 30.0
+
+# Attempts per request, and the cap on the exponential backoff between them
+MAX_ATTEMPTS = 3
+MAX_BACKOFF = 10.0
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Retry transient failures only; bad requests and credentials fail at once."""
+    if isinstance(error, (httpx.TimeoutException, httpx.NetworkError, RateLimitError)):
+        return True
+    return isinstance(error, ProviderError) and (error.status_code or 0) >= 500
+
+
+def _retry_wait(error: BaseException, attempt: int) -> float:
+    """Wait as long as the server asked, else back off exponentially with full jitter."""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return random.uniform(0, min(MAX_BACKOFF, 2.0 ** (attempt - 1)))
+
+
+def retry_request(func: F) -> F:
+    """
+    Retry a provider request on transient failures.
+
+    Makes up to MAX_ATTEMPTS attempts and re-raises the last error. Coroutine
+    functions sleep with asyncio.sleep, so retries never block the event loop.
+    """
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == MAX_ATTEMPTS or not _is_retryable(e):
+                        raise
+                    await asyncio.sleep(_retry_wait(e, attempt))
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS or not _is_retryable(e):
+                    raise
+                time.sleep(_retry_wait(e, attempt))
+
+    return wrapper  # type: ignore[return-value]
+
 
 class BaseProvider(ABC):
     """Base class for all LLM providers."""
 
+    # Whether ``async_batch_generate`` is implemented
+    supports_batch = False
+
+    # Set by each provider; a frozenset so the per-request model check is O(1)
+    DEFAULT_MODEL: ClassVar[str]
+    SUPPORTED_MODELS: ClassVar[FrozenSet[str]] = frozenset()
+
+    # Name reported in the errors raised for this provider
+    PROVIDER_NAME: ClassVar[str]
+    # Fixed messages by HTTP status, used instead of the error body's message
+    ERROR_MESSAGES: ClassVar[Dict[int, str]] = {
+        401: "Invalid API key",
+        429: "Rate limit exceeded",
+    }
+    # Where the message is in the provider's JSON error body
+    ERROR_MESSAGE_PATH: ClassVar[Tuple[str, ...]] = ("error", "message")
+
     def __init__(self, config: ProviderConfig):
         """Initialize the provider."""
         self.config = config
+        self._async_client: Optional[httpx.AsyncClient] = None
         self._validate_config()
 
     @property
-    @abstractmethod
     def default_model(self) -> str:
         """Default model for this provider."""
-        pass
+        return self.DEFAULT_MODEL
 
     @property
-    @abstractmethod
     def supported_models(self) -> List[str]:
         """List of supported models for this provider."""
-        pass
+        return sorted(self.SUPPORTED_MODELS)
 
     @abstractmethod
     def _validate_config(self) -> None:
@@ -67,6 +177,170 @@ class BaseProvider(ABC):
         """Async version of generate_stream."""
         pass
 
+    def generate_stream_batches(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Generator[List[StreamChunk], None, None]:
+        """
+        Generate streaming response as lists of chunks.
+
+        Each list holds the chunks that became available together, in stream
+        order. Providers that parse several events per network read override
+        this; the default yields one chunk per list.
+        """
+        for chunk in self.generate_stream(messages, config, **kwargs):
+            yield [chunk]
+
+    async def async_generate_stream_batches(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> AsyncGenerator[List[StreamChunk], None]:
+        """Async version of generate_stream_batches."""
+        async for chunk in self.async_generate_stream(messages, config, **kwargs):
+            yield [chunk]
+
+    async def async_batch_generate(
+        self,
+        messages_list: List[List[Message]],
+        config: GenerationConfig,
+        timeout: float,
+        **kwargs: Any,
+    ) -> List[Response]:
+        """Generate responses for many conversations through a batch API.
+
+        Only available when ``supports_batch`` is True.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support batch generation")
+
+    def _create_client(self, headers: Dict[str, str], **kwargs: Any) -> httpx.Client:
+        """
+        Create the sync client, backed by the shared connection pool.
+
+        The async client is created with the same settings on first use of
+        ``async_client``, so sync-only callers never build one. Reusing pooled
+        keep-alive (HTTP/2 where supported) connections saves a TCP+TLS
+        handshake on every request after the first to each host. Assign
+        ``provider.client`` / ``provider.async_client`` to use your own
+        clients instead, e.g. for custom TLS or proxy settings.
+        """
+        timeout = httpx.Timeout(
+            self.config.timeout, connect=min(self.config.timeout, CONNECT_TIMEOUT)
+        )
+        self._client_options = dict(timeout=timeout, headers=headers, **kwargs)
+        return httpx.Client(transport=SharedTransport(), **self._client_options)
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Async client, created on first use."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                transport=SharedAsyncTransport(), **self._client_options
+            )
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, client: httpx.AsyncClient) -> None:
+        self._async_client = client
+
+    def warmup(self) -> Optional["asyncio.Task"]:
+        """
+        Open a pooled connection to the API in the background.
+
+        Sends a HEAD request to ``base_url`` (any status will do) so that the
+        first real request skips DNS, TCP and TLS setup. Inside a running event
+        loop this warms the loop's pool with a task, which is returned;
+        otherwise a daemon thread warms the sync pool. Pools warmed for the host
+        within ``WARMUP_INTERVAL`` seconds are skipped.
+        """
+        url = getattr(self, "base_url", None)
+        if not url:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if not claim_warmup(url, loop):
+            return None
+        if loop is None:
+            threading.Thread(
+                target=self._warmup, args=(url,), name="llmx-warmup", daemon=True
+            ).start()
+            return None
+        task = loop.create_task(self._async_warmup(url))
+        _warmup_tasks.add(task)
+        task.add_done_callback(_warmup_tasks.discard)
+        return task
+
+    def _warmup(self, url: str) -> None:
+        try:
+            self.client.head(url, timeout=WARMUP_TIMEOUT)
+        except httpx.HTTPError:
+            pass
+
+    async def _async_warmup(self, url: str) -> None:
+        try:
+            await self.async_client.head(url, timeout=WARMUP_TIMEOUT)
+        except httpx.HTTPError:
+            pass
+
+    def close(self) -> None:
+        """Close the sync client. The shared connection pool stays open."""
+        client = getattr(self, "client", None)
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close both clients. The shared connection pools stay open."""
+        self.close()
+        # Don't create the async client just to close it
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Seconds to wait according to the response's Retry-After header, if any."""
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+        return max(delay, 0.0)
+
+    @staticmethod
+    def _error_message(error: httpx.HTTPStatusError, *path: str) -> str:
+        """Read the message at ``path`` in a JSON error body, else ``str(error)``."""
+        try:
+            value = orjson.loads(error.response.content)
+        except (orjson.JSONDecodeError, httpx.ResponseNotRead):
+            # Not JSON, or a streamed response whose body was never read
+            return str(error)
+        for key in path:
+            if not isinstance(value, dict):
+                return str(error)
+            value = value.get(key)
+        return value if isinstance(value, str) else str(error)
+
+    def _handle_http_error(self, error: httpx.HTTPStatusError) -> NoReturn:
+        """Raise the LLMX exception for an HTTP error response."""
+        response = error.response
+        status_code = response.status_code
+        message = self.ERROR_MESSAGES.get(status_code)
+        if message is None:
+            message = self._error_message(error, *self.ERROR_MESSAGE_PATH)
+
+        if status_code == 401:
+            raise AuthenticationError(message, provider=self.PROVIDER_NAME)
+        if status_code == 429:
+            raise RateLimitError(
+                message, provider=self.PROVIDER_NAME, retry_after=self._retry_after(response)
+            )
+        raise ProviderError(message, provider=self.PROVIDER_NAME, status_code=status_code)
+
     def _get_api_key(self, env_var: str) -> str:
         """Get API key from config or environment."""
         api_key = self.config.api_key or os.getenv(env_var)
@@ -79,7 +353,7 @@ class BaseProvider(ABC):
 
     def _validate_model(self, model: str) -> None:
         """Validate that the model is supported."""
-        if model not in self.supported_models:
+        if model not in self.SUPPORTED_MODELS:
             supported = ", ".join(self.supported_models)
             raise ConfigurationError(
                 f"Model '{model}' not supported by {self.__class__.__name__}. "
@@ -1,47 +1,56 @@
 """Anthropic Claude provider for LLMX."""
 
-import json
-from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
-from llmx.exceptions import AuthenticationError, ProviderError, RateLimitError
-from llmx.providers.base import BaseProvider
+from llmx.exceptions import ValidationError
+from llmx.providers._sse import aiter_sse_batches, iter_sse_batches
+from llmx.providers.base import BaseProvider, retry_request
 from llmx.types import (
-    Choice,
     GenerationConfig,
     Message,
     Response,
     StreamChunk,
-    Usage,
 )
 
 
 class ClaudeProvider(BaseProvider):
     """Anthropic Claude provider implementation."""
 
+    # Request body fields accepted by the Messages API, in addition to those
+    # derived from the messages and GenerationConfig
+    PAYLOAD_PARAMS = frozenset(
+        {
+            "max_tokens",
+            "metadata",
+            "service_tier",
+            "stop_sequences",
+            "stream",
+            "system",
+            "temperature",
+            "thinking",
+            "tool_choice",
+            "tools",
+            "top_k",
+            "top_p",
+        }
+    )
+
     def __init__(self, config):
         super().__init__(config)
         self.base_url = config.api_base or "https://api.anthropic.com/v1"
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-        self.async_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
+        self._headers = self._get_headers()
+        self.client = self._create_client(self._headers, base_url=self.base_url)
+        # (history, system prompt, Claude messages) of the last request
+        self._last_partition: Tuple[tuple, Optional[str], List[Dict[str, str]]] = ((), None, [])
 
-    @property
-    def default_model(self) -> str:
-        return "claude-3-haiku-20240307"
+    PROVIDER_NAME = "claude"
 
-    @property
-    def supported_models(self) -> List[str]:
-        return [
+    DEFAULT_MODEL = "claude-3-haiku-20240307"
+    SUPPORTED_MODELS = frozenset(
+        {
             "claude-3-haiku-20240307",
             "claude-3-sonnet-20240229",
             "claude-3-opus-20240229",
@@ -49,41 +58,61 @@ class ClaudeProvider(BaseProvider):
             "claude-2.1",
             "claude-2.0",
             "claude-instant-1.2",
-        ]
+        }
+    )
 
     def _validate_config(self) -> None:
         """Validate Claude configuration."""
-        self._get_api_key("ANTHROPIC_API_KEY")
+        self._api_key = self._get_api_key("ANTHROPIC_API_KEY")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
         return {
-            "x-api-key": self._get_api_key("ANTHROPIC_API_KEY"),
+            "x-api-key": self._api_key,
             "Content-Type": "application/json",
             "anthropic-version": "2023-06-01",
         }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
-    def generate(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
-    ) -> Response:
-        """Generate text using Claude API."""
-        model = config.model or self.default_model
-        self._validate_model(model)
+    def _partition_history(
+        self, history: Tuple[Tuple[str, str], ...]
+    ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        Split (role, content) pairs into the system prompt and Claude messages.
+
+        Chat loops resend the previous history plus new turns, so when
+        ``history`` extends the last one only the new pairs are converted.
+        """
+        last_history, system_message, claude_messages = self._last_partition
+        if history[: len(last_history)] == last_history:
+            new = history[len(last_history) :]
+            claude_messages = list(claude_messages)
+        else:
+            new = history
+            system_message = None
+            claude_messages = []
 
-        # Convert messages for Claude format
-        system_message = None
-        claude_messages = []
+        for role, content in new:
+            if role == "system":
+                system_message = content
+            else:
+                claude_messages.append({"role": role, "content": content})
+
+        self._last_partition = (history, system_message, claude_messages)
+        return system_message, claude_messages
 
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
+    def _build_payload(
+        self, messages: List[Message], config: GenerationConfig, model: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build a messages request body."""
+        system_message, claude_messages = self._partition_history(
+            tuple((msg.role, msg.content) for msg in messages[:-1])
+        )
+        if messages:
+            last = messages[-1]
+            if last.role == "system":
+                system_message = last.content
             else:
-                claude_messages.append({"role": msg.role, "content": msg.content})
+                claude_messages = [*claude_messages, {"role": last.role, "content": last.content}]
 
         payload = {
             "model": model,
@@ -98,20 +127,32 @@ class ClaudeProvider(BaseProvider):
         if config.top_p is not None:
             payload["top_p"] = config.top_p
 
+        unknown = kwargs.keys() - self.PAYLOAD_PARAMS
+        if unknown:
+            raise ValidationError(
+                f"Unsupported Claude parameters: {', '.join(sorted(unknown))}"
+            )
         payload.update(kwargs)
+        return payload
+
+    @retry_request
+    def generate(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Response:
+        """Generate text using Claude API."""
+        model = config.model or self.default_model
+        self._validate_model(model)
+
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = self.client.post("/messages", json=payload)
+            response = self.client.post("/messages", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+    @retry_request
     async def async_generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -119,35 +160,12 @@ class ClaudeProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages for Claude format
-        system_message = None
-        claude_messages = []
-
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
-            else:
-                claude_messages.append({"role": msg.role, "content": msg.content})
-
-        payload = {
-            "model": model,
-            "messages": claude_messages,
-            "max_tokens": config.max_tokens or 1024,
-        }
-
-        if system_message:
-            payload["system"] = system_message
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = await self.async_client.post("/messages", json=payload)
+            response = await self.async_client.post("/messages", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -155,48 +173,25 @@ class ClaudeProvider(BaseProvider):
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Generator[StreamChunk, None, None]:
         """Generate streaming response."""
+        for batch in self.generate_stream_batches(messages, config, **kwargs):
+            yield from batch
+
+    def generate_stream_batches(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Generator[List[StreamChunk], None, None]:
+        """Generate streaming response, one list per network read."""
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages for Claude format
-        system_message = None
-        claude_messages = []
-
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
-            else:
-                claude_messages.append({"role": msg.role, "content": msg.content})
-
-        payload = {
-            "model": model,
-            "messages": claude_messages,
-            "max_tokens": config.max_tokens or 1024,
-            "stream": True,
-        }
-
-        if system_message:
-            payload["system"] = system_message
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            with self.client.stream("POST", "/messages", json=payload) as response:
+            with self.client.stream("POST", "/messages", content=orjson.dumps(payload)) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                for events in iter_sse_batches(response.iter_bytes()):
+                    batch = self._parse_stream_events(events)
+                    if batch:
+                        yield batch
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -204,85 +199,72 @@ class ClaudeProvider(BaseProvider):
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> AsyncGenerator[StreamChunk, None]:
         """Async version of generate_stream."""
+        async for batch in self.async_generate_stream_batches(messages, config, **kwargs):
+            for chunk in batch:
+                yield chunk
+
+    async def async_generate_stream_batches(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> AsyncGenerator[List[StreamChunk], None]:
+        """Async version of generate_stream_batches."""
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages for Claude format
-        system_message = None
-        claude_messages = []
-
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
-            else:
-                claude_messages.append({"role": msg.role, "content": msg.content})
-
-        payload = {
-            "model": model,
-            "messages": claude_messages,
-            "max_tokens": config.max_tokens or 1024,
-            "stream": True,
-        }
-
-        if system_message:
-            payload["system"] = system_message
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            async with self.async_client.stream("POST", "/messages", json=payload) as response:
+            async with self.async_client.stream(
+                "POST", "/messages", content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                async for events in aiter_sse_batches(response.aiter_bytes()):
+                    batch = self._parse_stream_events(events)
+                    if batch:
+                        yield batch
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
     def _parse_response(self, data: Dict[str, Any], model: str) -> Response:
         """Parse Claude response."""
-        content = ""
-        for content_block in data.get("content", []):
-            if content_block.get("type") == "text":
-                content += content_block.get("text", "")
+        content = "".join(
+            block.get("text", "") for block in data.get("content", ()) if block.get("type") == "text"
+        )
 
-        choices = [Choice(content=content, finish_reason=data.get("stop_reason"))]
+        choices = [{"content": content, "finish_reason": data.get("stop_reason")}]
 
         usage_data = data.get("usage", {})
-        usage = Usage(
-            prompt_tokens=usage_data.get("input_tokens", 0),
-            completion_tokens=usage_data.get("output_tokens", 0),
-            total_tokens=usage_data.get("input_tokens", 0) + usage_data.get("output_tokens", 0),
-        )
+        usage = {
+            "prompt_tokens": usage_data.get("input_tokens", 0),
+            "completion_tokens": usage_data.get("output_tokens", 0),
+            "total_tokens": usage_data.get("input_tokens", 0) + usage_data.get("output_tokens", 0),
+        }
 
-        return Response(
-            text=choices,
-            usage=usage,
-            provider="claude",
-            model=model,
+        # One validation call builds the nested models
+        return Response.model_validate(
+            {"text": choices, "usage": usage, "provider": "claude", "model": model}
         )
 
+    def _parse_stream_events(self, events: List[bytes]) -> List[StreamChunk]:
+        """Parse the SSE payloads of one read into chunks, keeping their order."""
+        chunks = []
+        for data in events:
+            try:
+                chunk = self._parse_stream_chunk(orjson.loads(data))
+            except orjson.JSONDecodeError:
+                continue
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
     def _parse_stream_chunk(self, data: Dict[str, Any]) -> Optional[StreamChunk]:
         """Parse streaming chunk."""
-        if data.get("type") == "content_block_delta":
+        event_type = data.get("type")
+        if event_type == "content_block_delta":
             delta = data.get("delta", {})
             if delta.get("type") == "text_delta":
-                return StreamChunk(
-                    content=delta.get("text", ""),
-                    finish_reason=None,
-                    done=False,
-                )
-        elif data.get("type") == "message_stop":
+                # Leave the defaulted fields out; pydantic fills defaults faster
+                return StreamChunk(content=delta.get("text", ""))
+        elif event_type == "message_stop":
             return StreamChunk(
                 content="",
                 finish_reason="stop",
@@ -290,20 +272,3 @@ class ClaudeProvider(BaseProvider):
             )
 
         return None
-
-    def _handle_http_error(self, error: httpx.HTTPStatusError) -> None:
-        """Handle HTTP errors from Claude API."""
-        status_code = error.response.status_code
-
-        if status_code == 401:
-            raise AuthenticationError("Invalid API key", provider="claude")
-        elif status_code == 429:
-            raise RateLimitError("Rate limit exceeded", provider="claude")
-        else:
-            try:
-                error_data = error.response.json()
-                error_message = error_data.get("error", {}).get("message", str(error))
-            except:
-                error_message = str(error)
-
-            raise ProviderError(error_message, provider="claude", status_code=status_code)
\ No newline at end of file
@@ -1,22 +1,22 @@
 """Cohere provider for LLMX."""
 
-import json
 from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
-from llmx.exceptions import AuthenticationError, ProviderError, RateLimitError
-from llmx.providers.base import BaseProvider
+from llmx.providers._sse import aiter_lines, iter_lines
+from llmx.providers.base import BaseProvider, retry_request
 from llmx.types import (
-    Choice,
     GenerationConfig,
     Message,
     Response,
     StreamChunk,
-    Usage,
 )
 
+# Prefix of each message in the flattened prompt
+_ROLE_PREFIX = {"system": "System: ", "user": "User: ", "assistant": "Assistant: "}
+
 
 class CohereProvider(BaseProvider):
     """Cohere provider implementation."""
@@ -24,60 +24,41 @@ class CohereProvider(BaseProvider):
     def __init__(self, config):
         super().__init__(config)
         self.base_url = config.api_base or "https://api.cohere.ai/v1"
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-        self.async_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
+        self._headers = self._get_headers()
+        self.client = self._create_client(self._headers, base_url=self.base_url)
 
-    @property
-    def default_model(self) -> str:
-        return "command"
+    PROVIDER_NAME = "cohere"
+    ERROR_MESSAGE_PATH = ("message",)
 
-    @property
-    def supported_models(self) -> List[str]:
-        return [
+    DEFAULT_MODEL = "command"
+    SUPPORTED_MODELS = frozenset(
+        {
             "command",
             "command-light",
             "command-nightly",
             "command-r",
             "command-r-plus",
-        ]
+        }
+    )
 
     def _validate_config(self) -> None:
         """Validate Cohere configuration."""
-        self._get_api_key("COHERE_API_KEY")
+        self._api_key = self._get_api_key("COHERE_API_KEY")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
         return {
-            "Authorization": f"Bearer {self._get_api_key('COHERE_API_KEY')}",
+            "Authorization": f"Bearer {self._api_key}",
             "Content-Type": "application/json",
         }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
-    def generate(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
-    ) -> Response:
-        """Generate text using Cohere API."""
-        model = config.model or self.default_model
-        self._validate_model(model)
-
-        # Convert messages to Cohere format
-        message = self._convert_messages_to_cohere(messages)
-
+    def _build_payload(
+        self, messages: List[Message], config: GenerationConfig, model: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build a chat request body."""
         payload = {
             "model": model,
-            "message": message,
+            "message": self._convert_messages_to_cohere(messages),
         }
 
         if config.max_tokens:
@@ -88,19 +69,26 @@ class CohereProvider(BaseProvider):
             payload["p"] = config.top_p
 
         payload.update(kwargs)
+        return payload
+
+    @retry_request
+    def generate(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Response:
+        """Generate text using Cohere API."""
+        model = config.model or self.default_model
+        self._validate_model(model)
+
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = self.client.post("/chat", json=payload)
+            response = self.client.post("/chat", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+    @retry_request
     async def async_generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -108,27 +96,12 @@ class CohereProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages to Cohere format
-        message = self._convert_messages_to_cohere(messages)
-
-        payload = {
-            "model": model,
-            "message": message,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = await self.async_client.post("/chat", json=payload)
+            response = await self.async_client.post("/chat", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -139,36 +112,18 @@ class CohereProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages to Cohere format
-        message = self._convert_messages_to_cohere(messages)
-
-        payload = {
-            "model": model,
-            "message": message,
-            "stream": True,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            with self.client.stream("POST", "/chat", json=payload) as response:
+            with self.client.stream("POST", "/chat", content=orjson.dumps(payload)) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk_data = json.loads(line)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                for line in iter_lines(response.iter_bytes()):
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -179,36 +134,20 @@ class CohereProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        # Convert messages to Cohere format
-        message = self._convert_messages_to_cohere(messages)
-
-        payload = {
-            "model": model,
-            "message": message,
-            "stream": True,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            async with self.async_client.stream("POST", "/chat", json=payload) as response:
+            async with self.async_client.stream(
+                "POST", "/chat", content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line:
-                        try:
-                            chunk_data = json.loads(line)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                async for line in aiter_lines(response.aiter_bytes()):
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -216,60 +155,38 @@ class CohereProvider(BaseProvider):
         """Convert messages to Cohere format."""
         # Cohere expects a simple string message
         # For now, we'll concatenate all messages
-        parts = []
-        for msg in messages:
-            if msg.role == "system":
-                parts.append(f"System: {msg.content}")
-            elif msg.role == "user":
-                parts.append(f"User: {msg.content}")
-            elif msg.role == "assistant":
-                parts.append(f"Assistant: {msg.content}")
-
-        return "\n".join(parts)
+        return "\n".join(
+            _ROLE_PREFIX[msg.role] + msg.content for msg in messages if msg.role in _ROLE_PREFIX
+        )
 
     def _parse_response(self, data: Dict[str, Any], model: str) -> Response:
         """Parse Cohere response."""
         text = data.get("text", "")
-        choices = [Choice(content=text, finish_reason=data.get("finish_reason"))]
+        choices = [{"content": text, "finish_reason": data.get("finish_reason")}]
 
         # Cohere doesn't provide detailed usage stats in all responses
-        usage = Usage(
-            prompt_tokens=0,  # Not provided by Cohere
-            completion_tokens=0,  # Not provided by Cohere
-            total_tokens=0,  # Not provided by Cohere
-        )
+        usage = {
+            "prompt_tokens": 0,  # Not provided by Cohere
+            "completion_tokens": 0,  # Not provided by Cohere
+            "total_tokens": 0,  # Not provided by Cohere
+        }
 
-        return Response(
-            text=choices,
-            usage=usage,
-            provider="cohere",
-            model=model,
+        # One validation call builds the nested models
+        return Response.model_validate(
+            {"text": choices, "usage": usage, "provider": "cohere", "model": model}
         )
 
     def _parse_stream_chunk(self, data: Dict[str, Any]) -> Optional[StreamChunk]:
         """Parse streaming chunk."""
-        if "text" in data:
+        if data.get("is_finished"):
+            # stream-end carries the full response but no top-level text
             return StreamChunk(
                 content=data.get("text", ""),
                 finish_reason=data.get("finish_reason"),
-                done=data.get("is_finished", False),
+                done=True,
             )
+        if "text" in data:
+            # Most chunks; leaving the defaulted fields out validates faster
+            return StreamChunk(content=data["text"])
 
         return None
-
-    def _handle_http_error(self, error: httpx.HTTPStatusError) -> None:
-        """Handle HTTP errors from Cohere API."""
-        status_code = error.response.status_code
-
-        if status_code == 401:
-            raise AuthenticationError("Invalid API key", provider="cohere")
-        elif status_code == 429:
-            raise RateLimitError("Rate limit exceeded", provider="cohere")
-        else:
-            try:
-                error_data = error.response.json()
-                error_message = error_data.get("message", str(error))
-            except:
-                error_message = str(error)
-
-            raise ProviderError(error_message, provider="cohere", status_code=status_code)
\ No newline at end of file
@@ -1,20 +1,17 @@
 """xAI Grok provider for LLMX."""
 
-import json
 from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
-from llmx.exceptions import AuthenticationError, ProviderError, RateLimitError
-from llmx.providers.base import BaseProvider
+from llmx.providers._sse import DONE, aiter_sse_data, iter_sse_data
+from llmx.providers.base import BaseProvider, retry_request
 from llmx.types import (
-    Choice,
     GenerationConfig,
     Message,
     Response,
     StreamChunk,
-    Usage,
 )
 
 
@@ -24,51 +21,34 @@ class GrokProvider(BaseProvider):
     def __init__(self, config):
         super().__init__(config)
         self.base_url = config.api_base or "https://api.x.ai/v1"
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-        self.async_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
+        self._headers = self._get_headers()
+        self.client = self._create_client(self._headers, base_url=self.base_url)
 
-    @property
-    def default_model(self) -> str:
-        return "grok-beta"
+    PROVIDER_NAME = "grok"
 
-    @property
-    def supported_models(self) -> List[str]:
-        return [
+    DEFAULT_MODEL = "grok-beta"
+    SUPPORTED_MODELS = frozenset(
+        {
             "grok-beta",
             "grok-vision-beta",
-        ]
+        }
+    )
 
     def _validate_config(self) -> None:
         """Validate Grok configuration."""
-        self._get_api_key("XAI_API_KEY")
+        self._api_key = self._get_api_key("XAI_API_KEY")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
         return {
-            "Authorization": f"Bearer {self._get_api_key('XAI_API_KEY')}",
+            "Authorization": f"Bearer {self._api_key}",
             "Content-Type": "application/json",
         }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
-    def generate(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
-    ) -> Response:
-        """Generate text using Grok API."""
-        model = config.model or self.default_model
-        self._validate_model(model)
-
+    def _build_payload(
+        self, messages: List[Message], config: GenerationConfig, model: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build a chat completions request body."""
         payload = {
             "model": model,
             "messages": self._prepare_messages(messages),
@@ -82,19 +62,26 @@ class GrokProvider(BaseProvider):
             payload["top_p"] = config.top_p
 
         payload.update(kwargs)
+        return payload
+
+    @retry_request
+    def generate(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Response:
+        """Generate text using Grok API."""
+        model = config.model or self.default_model
+        self._validate_model(model)
+
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = self.client.post("/chat/completions", json=payload)
+            response = self.client.post("/chat/completions", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+    @retry_request
     async def async_generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -102,24 +89,14 @@ class GrokProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = await self.async_client.post("/chat/completions", json=payload)
+            response = await self.async_client.post(
+                "/chat/completions", content=orjson.dumps(payload)
+            )
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -130,36 +107,22 @@ class GrokProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-            "stream": True,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            with self.client.stream(
+                "POST", "/chat/completions", content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                for data in iter_sse_data(response.iter_bytes()):
+                    if data == DONE:
+                        break
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(data))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -170,59 +133,46 @@ class GrokProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-            "stream": True,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            async with self.async_client.stream("POST", "/chat/completions", json=payload) as response:
+            async with self.async_client.stream(
+                "POST", "/chat/completions", content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                async for data in aiter_sse_data(response.aiter_bytes()):
+                    if data == DONE:
+                        break
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(data))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
     def _parse_response(self, data: Dict[str, Any], model: str) -> Response:
         """Parse Grok response."""
-        choices = []
-        for choice in data.get("choices", []):
-            content = choice.get("message", {}).get("content", "")
-            finish_reason = choice.get("finish_reason")
-            choices.append(Choice(content=content, finish_reason=finish_reason))
+        choices = [
+            # Tool call responses send "content": null
+            {
+                "content": choice.get("message", {}).get("content") or "",
+                "finish_reason": choice.get("finish_reason"),
+            }
+            for choice in data.get("choices", ())
+        ]
 
         usage_data = data.get("usage", {})
-        usage = Usage(
-            prompt_tokens=usage_data.get("prompt_tokens", 0),
-            completion_tokens=usage_data.get("completion_tokens", 0),
-            total_tokens=usage_data.get("total_tokens", 0),
-        )
+        usage = {
+            "prompt_tokens": usage_data.get("prompt_tokens", 0),
+            "completion_tokens": usage_data.get("completion_tokens", 0),
+            "total_tokens": usage_data.get("total_tokens", 0),
+        }
 
-        return Response(
-            text=choices,
-            usage=usage,
-            provider="grok",
-            model=model,
+        # One validation call builds the nested models
+        return Response.model_validate(
+            {"text": choices, "usage": usage, "provider": "grok", "model": model}
         )
 
     def _parse_stream_chunk(self, data: Dict[str, Any]) -> Optional[StreamChunk]:
@@ -233,28 +183,14 @@ class GrokProvider(BaseProvider):
 
         choice = choices[0]
         delta = choice.get("delta", {})
-        content = delta.get("content", "")
+        # Tool call deltas send "content": null
+        content = delta.get("content") or ""
         finish_reason = choice.get("finish_reason")
-
-        return StreamChunk(
-            content=content,
-            finish_reason=finish_reason,
-            done=finish_reason is not None,
-        )
-
-    def _handle_http_error(self, error: httpx.HTTPStatusError) -> None:
-        """Handle HTTP errors from Grok API."""
-        status_code = error.response.status_code
-
-        if status_code == 401:
-            raise AuthenticationError("Invalid API key", provider="grok")
-        elif status_code == 429:
-            raise RateLimitError("Rate limit exceeded", provider="grok")
-        else:
-            try:
-                error_data = error.response.json()
-                error_message = error_data.get("error", {}).get("message", str(error))
-            except:
-                error_message = str(error)
-
-            raise ProviderError(error_message, provider="grok", status_code=status_code)
\ No newline at end of file
+        if finish_reason is None:
+            if not content:
+                # Role-only first delta or an empty keep-alive; nothing to yield
+                return None
+            # Most chunks; leaving the defaulted fields out validates faster
+            return StreamChunk(content=content)
+
+        return StreamChunk(content=content, finish_reason=finish_reason, done=True)
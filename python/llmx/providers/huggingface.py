@@ -1,22 +1,28 @@
 """HuggingFace provider for LLMX."""
 
-import json
+import os
 from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
-from llmx.exceptions import AuthenticationError, ProviderError, RateLimitError, ConfigurationError
-from llmx.providers.base import BaseProvider
+from llmx.exceptions import ConfigurationError
+from llmx.providers.base import BaseProvider, retry_request
 from llmx.types import (
-    Choice,
     GenerationConfig,
     Message,
     Response,
     StreamChunk,
-    Usage,
 )
 
+# Prefix of each message in the flattened prompt
+_ROLE_PREFIX = {"system": "System: ", "user": "Human: ", "assistant": "Assistant: "}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimate a token count at about four characters per token, rounding up."""
+    return (len(text) + 3) // 4
+
 
 class HuggingFaceProvider(BaseProvider):
     """HuggingFace provider implementation."""
@@ -25,22 +31,25 @@ class HuggingFaceProvider(BaseProvider):
         super().__init__(config)
         # Default to HF Inference API, but allow custom endpoints
         self.base_url = config.api_base or "https://api-inference.huggingface.co/models"
-        self.client = httpx.Client(
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-        self.async_client = httpx.AsyncClient(
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-
-    @property
-    def default_model(self) -> str:
-        return "microsoft/DialoGPT-medium"
-
-    @property
-    def supported_models(self) -> List[str]:
-        return [
+        self._headers = self._get_headers()
+        self.client = self._create_client(self._headers)
+        # Inference URL of each model requested so far
+        self._model_urls: Dict[str, str] = {}
+
+    PROVIDER_NAME = "huggingface"
+    ERROR_MESSAGE_PATH = ("error",)
+    ERROR_MESSAGES = {
+        **BaseProvider.ERROR_MESSAGES,
+        401: "Invalid HuggingFace token",
+        503: "Model is currently loading, please try again later",
+    }
+
+    # Characters per chunk when simulating a stream from a complete response
+    STREAM_CHUNK_SIZE = 512
+
+    DEFAULT_MODEL = "microsoft/DialoGPT-medium"
+    SUPPORTED_MODELS = frozenset(
+        {
             "microsoft/DialoGPT-medium",
             "microsoft/DialoGPT-large",
             "facebook/blenderbot-400M-distill",
@@ -50,32 +59,46 @@ class HuggingFaceProvider(BaseProvider):
             "meta-llama/Llama-2-7b-chat-hf",
             "meta-llama/Llama-2-13b-chat-hf",
             "codellama/CodeLlama-7b-Instruct-hf",
-        ]
+        }
+    )
 
     def _validate_config(self) -> None:
         """Validate HuggingFace configuration."""
         # HF token is optional for public models
-        pass
+        self._api_key = self.config.api_key or os.getenv("HUGGINGFACE_API_TOKEN")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
         headers = {"Content-Type": "application/json"}
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        return headers
 
-        # Try to get HF token
-        try:
-            token = self._get_api_key("HUGGINGFACE_API_TOKEN")
-            headers["Authorization"] = f"Bearer {token}"
-        except AuthenticationError:
-            # Token is optional for public models
-            pass
+    def _model_url(self, model: str) -> str:
+        """Get the inference URL for a model; a custom endpoint may already name it."""
+        url = self._model_urls.get(model)
+        if url is None:
+            url = self.base_url if self.base_url.endswith(model) else f"{self.base_url}/{model}"
+            self._model_urls[model] = url
+        return url
 
-        return headers
+    def _build_payload(
+        self, input_text: str, config: GenerationConfig, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build an inference request body."""
+        parameters: Dict[str, Any] = {}
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+        if config.max_tokens:
+            parameters["max_new_tokens"] = config.max_tokens
+        if config.temperature is not None:
+            parameters["temperature"] = config.temperature
+        if config.top_p is not None:
+            parameters["top_p"] = config.top_p
+
+        parameters.update(kwargs)
+        return {"inputs": input_text, "parameters": parameters}
+
+    @retry_request
     def generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -85,33 +108,17 @@ class HuggingFaceProvider(BaseProvider):
         # Convert messages to HF format
         input_text = self._convert_messages_to_hf(messages)
 
-        payload = {
-            "inputs": input_text,
-            "parameters": {},
-        }
-
-        if config.max_tokens:
-            payload["parameters"]["max_new_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["parameters"]["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["parameters"]["top_p"] = config.top_p
-
-        payload["parameters"].update(kwargs)
+        payload = self._build_payload(input_text, config, **kwargs)
 
         try:
-            url = f"{self.base_url}/{model}" if not self.base_url.endswith(model) else self.base_url
-            response = self.client.post(url, json=payload)
+            url = self._model_url(model)
+            response = self.client.post(url, content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model, input_text)
+            return self._parse_response(orjson.loads(response.content), model, input_text)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+    @retry_request
     async def async_generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -121,25 +128,13 @@ class HuggingFaceProvider(BaseProvider):
         # Convert messages to HF format
         input_text = self._convert_messages_to_hf(messages)
 
-        payload = {
-            "inputs": input_text,
-            "parameters": {},
-        }
-
-        if config.max_tokens:
-            payload["parameters"]["max_new_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["parameters"]["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["parameters"]["top_p"] = config.top_p
-
-        payload["parameters"].update(kwargs)
+        payload = self._build_payload(input_text, config, **kwargs)
 
         try:
-            url = f"{self.base_url}/{model}" if not self.base_url.endswith(model) else self.base_url
-            response = await self.async_client.post(url, json=payload)
+            url = self._model_url(model)
+            response = await self.async_client.post(url, content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model, input_text)
+            return self._parse_response(orjson.loads(response.content), model, input_text)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -150,20 +145,7 @@ class HuggingFaceProvider(BaseProvider):
         # HuggingFace Inference API doesn't support streaming by default
         # We'll simulate streaming by yielding the full response
         response = self.generate(messages, config, **kwargs)
-
-        # Simulate streaming by yielding chunks
-        content = response.text[0].content
-        chunk_size = 10  # Characters per chunk
-
-        for i in range(0, len(content), chunk_size):
-            chunk = content[i:i + chunk_size]
-            is_last = i + chunk_size >= len(content)
-
-            yield StreamChunk(
-                content=chunk,
-                finish_reason="stop" if is_last else None,
-                done=is_last,
-            )
+        yield from self._split_content(response.text[0].content)
 
     async def async_generate_stream(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
@@ -172,33 +154,25 @@ class HuggingFaceProvider(BaseProvider):
         # HuggingFace Inference API doesn't support streaming by default
         # We'll simulate streaming by yielding the full response
         response = await self.async_generate(messages, config, **kwargs)
-
-        # Simulate streaming by yielding chunks
-        content = response.text[0].content
-        chunk_size = 10  # Characters per chunk
-
-        for i in range(0, len(content), chunk_size):
-            chunk = content[i:i + chunk_size]
-            is_last = i + chunk_size >= len(content)
-
-            yield StreamChunk(
-                content=chunk,
-                finish_reason="stop" if is_last else None,
-                done=is_last,
-            )
+        for chunk in self._split_content(response.text[0].content):
+            yield chunk
+
+    def _split_content(self, content: str) -> Generator[StreamChunk, None, None]:
+        """Split a complete response into stream chunks, the last one marked done."""
+        size = self.STREAM_CHUNK_SIZE
+        last = max(len(content) - 1, 0) // size * size
+        for i in range(0, last, size):
+            yield StreamChunk(content=content[i : i + size])
+        # content[0:] is content itself, so short responses are not copied
+        yield StreamChunk(content=content[last:], finish_reason="stop", done=True)
 
     def _convert_messages_to_hf(self, messages: List[Message]) -> str:
         """Convert messages to HuggingFace format."""
         # Most HF models expect a simple text input
         # We'll format it as a conversation
-        parts = []
-        for msg in messages:
-            if msg.role == "system":
-                parts.append(f"System: {msg.content}")
-            elif msg.role == "user":
-                parts.append(f"Human: {msg.content}")
-            elif msg.role == "assistant":
-                parts.append(f"Assistant: {msg.content}")
+        parts = [
+            _ROLE_PREFIX[msg.role] + msg.content for msg in messages if msg.role in _ROLE_PREFIX
+        ]
 
         # Add a prompt for the assistant to respond
         if not parts or not parts[-1].startswith("Assistant:"):
@@ -226,38 +200,18 @@ class HuggingFaceProvider(BaseProvider):
         else:
             content = str(data)
 
-        choices = [Choice(content=content, finish_reason="stop")]
+        choices = [{"content": content, "finish_reason": "stop"}]
 
-        # HuggingFace doesn't provide detailed usage stats
-        usage = Usage(
-            prompt_tokens=len(input_text.split()),  # Rough estimate
-            completion_tokens=len(content.split()),  # Rough estimate
-            total_tokens=len(input_text.split()) + len(content.split()),
-        )
+        # HuggingFace doesn't provide usage stats, so estimate them
+        prompt_tokens = _estimate_tokens(input_text)
+        completion_tokens = _estimate_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
 
-        return Response(
-            text=choices,
-            usage=usage,
-            provider="huggingface",
-            model=model,
+        # One validation call builds the nested models
+        return Response.model_validate(
+            {"text": choices, "usage": usage, "provider": "huggingface", "model": model}
         )
-
-    def _handle_http_error(self, error: httpx.HTTPStatusError) -> None:
-        """Handle HTTP errors from HuggingFace API."""
-        status_code = error.response.status_code
-
-        if status_code == 401:
-            raise AuthenticationError("Invalid HuggingFace token", provider="huggingface")
-        elif status_code == 429:
-            raise RateLimitError("Rate limit exceeded", provider="huggingface")
-        elif status_code == 503:
-            raise ProviderError("Model is currently loading, please try again later",
-                              provider="huggingface", status_code=status_code)
-        else:
-            try:
-                error_data = error.response.json()
-                error_message = error_data.get("error", str(error))
-            except:
-                error_message = str(error)
-
-            raise ProviderError(error_message, provider="huggingface", status_code=status_code)
\ No newline at end of file
@@ -1,20 +1,21 @@
 """OpenAI provider for LLMX."""
 
-import json
+import asyncio
+import os
+import time
 from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
-from llmx.exceptions import AuthenticationError, ProviderError, RateLimitError
-from llmx.providers.base import BaseProvider
+from llmx.exceptions import BatchError, ProviderError
+from llmx.providers._sse import DONE, aiter_sse_data, iter_sse_data
+from llmx.providers.base import BaseProvider, retry_request
 from llmx.types import (
-    Choice,
     GenerationConfig,
     Message,
     Response,
     StreamChunk,
-    Usage,
 )
 
 
@@ -24,24 +25,16 @@ class OpenAIProvider(BaseProvider):
     def __init__(self, config):
         super().__init__(config)
         self.base_url = config.api_base or "https://api.openai.com/v1"
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
-        self.async_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=config.timeout,
-            headers=self._get_headers(),
-        )
+        self._headers = self._get_headers()
+        self.client = self._create_client(self._headers, base_url=self.base_url)
+
+    supports_batch = True
 
-    @property
-    def default_model(self) -> str:
-        return "gpt-3.5-turbo"
+    PROVIDER_NAME = "openai"
 
-    @property
-    def supported_models(self) -> List[str]:
-        return [
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    SUPPORTED_MODELS = frozenset(
+        {
             "gpt-3.5-turbo",
             "gpt-3.5-turbo-16k",
             "gpt-4",
@@ -49,34 +42,27 @@ class OpenAIProvider(BaseProvider):
             "gpt-4-turbo",
             "gpt-4o",
             "gpt-4o-mini",
-        ]
+        }
+    )
 
     def _validate_config(self) -> None:
         """Validate OpenAI configuration."""
-        self._get_api_key("OPENAI_API_KEY")
+        self._api_key = self._get_api_key("OPENAI_API_KEY")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
         headers = {
-            "Authorization": f"Bearer {self._get_api_key('OPENAI_API_KEY')}",
+            "Authorization": f"Bearer {self._api_key}",
             "Content-Type": "application/json",
         }
         if self.config.organization:
             headers["OpenAI-Organization"] = self.config.organization
         return headers
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
-    def generate(
-        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
-    ) -> Response:
-        """Generate text using OpenAI API."""
-        model = config.model or self.default_model
-        self._validate_model(model)
-
+    def _build_payload(
+        self, messages: List[Message], config: GenerationConfig, model: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build a chat completions request body."""
         payload = {
             "model": model,
             "messages": self._prepare_messages(messages),
@@ -90,19 +76,26 @@ class OpenAIProvider(BaseProvider):
             payload["top_p"] = config.top_p
 
         payload.update(kwargs)
+        return payload
+
+    @retry_request
+    def generate(
+        self, messages: List[Message], config: GenerationConfig, **kwargs: Any
+    ) -> Response:
+        """Generate text using OpenAI API."""
+        model = config.model or self.default_model
+        self._validate_model(model)
+
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = self.client.post("/chat/completions", json=payload)
+            response = self.client.post("/chat/completions", content=orjson.dumps(payload))
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
+    @retry_request
     async def async_generate(
         self, messages: List[Message], config: GenerationConfig, **kwargs: Any
     ) -> Response:
@@ -110,24 +103,14 @@ class OpenAIProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, **kwargs)
 
         try:
-            response = await self.async_client.post("/chat/completions", json=payload)
+            response = await self.async_client.post(
+                "/chat/completions", content=orjson.dumps(payload)
+            )
             response.raise_for_status()
-            return self._parse_response(response.json(), model)
+            return self._parse_response(orjson.loads(response.content), model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -138,36 +121,22 @@ class OpenAIProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-            "stream": True,
-        }
-
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
-
-        payload.update(kwargs)
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
         try:
-            with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            with self.client.stream(
+                "POST", "/chat/completions", content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                for data in iter_sse_data(response.iter_bytes()):
+                    if data == DONE:
+                        break
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(data))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
@@ -178,59 +147,142 @@ class OpenAIProvider(BaseProvider):
         model = config.model or self.default_model
         self._validate_model(model)
 
-        payload = {
-            "model": model,
-            "messages": self._prepare_messages(messages),
-            "stream": True,
-        }
+        payload = self._build_payload(messages, config, model, stream=True, **kwargs)
 
-        if config.max_tokens:
-            payload["max_tokens"] = config.max_tokens
-        if config.temperature is not None:
-            payload["temperature"] = config.temperature
-        if config.top_p is not None:
-            payload["top_p"] = config.top_p
+        try:
+            async with self.async_client.stream(
+                "POST", "/chat/completions", content=orjson.dumps(payload)
+            ) as response:
+                response.raise_for_status()
+                async for data in aiter_sse_data(response.aiter_bytes()):
+                    if data == DONE:
+                        break
+                    try:
+                        chunk = self._parse_stream_chunk(orjson.loads(data))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if chunk:
+                        yield chunk
+        except httpx.HTTPStatusError as e:
+            self._handle_http_error(e)
 
-        payload.update(kwargs)
+    async def async_batch_generate(
+        self,
+        messages_list: List[List[Message]],
+        config: GenerationConfig,
+        timeout: float,
+        **kwargs: Any,
+    ) -> List[Response]:
+        """Generate responses through the Batch API, in the order of ``messages_list``."""
+        model = config.model or self.default_model
+        self._validate_model(model)
+
+        lines = [
+            orjson.dumps(
+                {
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._build_payload(messages, config, model, **kwargs),
+                }
+            )
+            for i, messages in enumerate(messages_list)
+        ]
 
         try:
-            async with self.async_client.stream("POST", "/chat/completions", json=payload) as response:
+            input_file = await self._upload_batch_file(b"\n".join(lines))
+            response = await self.async_client.post(
+                "/batches",
+                content=orjson.dumps(
+                    {
+                        "input_file_id": input_file["id"],
+                        "endpoint": "/v1/chat/completions",
+                        "completion_window": "24h",
+                    }
+                ),
+            )
+            response.raise_for_status()
+            batch = await self._wait_for_batch(orjson.loads(response.content), timeout)
+
+            results: List[Optional[Response]] = [None] * len(messages_list)
+            if batch.get("output_file_id"):
+                response = await self.async_client.get(f"/files/{batch['output_file_id']}/content")
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        try:
-                            chunk_data = json.loads(data)
-                            chunk = self._parse_stream_chunk(chunk_data)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+                for line in response.content.splitlines():
+                    if not line.strip():
+                        continue
+                    item = orjson.loads(line)
+                    body = (item.get("response") or {}).get("body")
+                    if body and item["response"].get("status_code") == 200:
+                        results[int(item["custom_id"])] = self._parse_response(body, model)
         except httpx.HTTPStatusError as e:
             self._handle_http_error(e)
 
+        failed = sum(result is None for result in results)
+        if failed:
+            # The batch is paid for; hand back the successful responses too
+            raise BatchError(
+                f"Batch {batch['id']} finished with status '{batch['status']}'; "
+                f"{failed} of {len(results)} requests failed",
+                provider="openai",
+                results=results,
+            )
+        return results
+
+    async def _upload_batch_file(self, content: bytes) -> Dict[str, Any]:
+        """Upload a JSONL batch input file."""
+        # The client defaults to a JSON content type, so set the multipart
+        # header explicitly; httpx takes the boundary from it.
+        boundary = os.urandom(16).hex()
+        response = await self.async_client.post(
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", content, "application/jsonl")},
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def _wait_for_batch(self, batch: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Poll a batch with exponential backoff until it reaches a final status."""
+        deadline = time.monotonic() + timeout
+        delay = 1.0
+        while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ProviderError(
+                    f"Batch {batch['id']} did not finish within {timeout} seconds",
+                    provider="openai",
+                )
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 60.0)
+
+            response = await self.async_client.get(f"/batches/{batch['id']}")
+            response.raise_for_status()
+            batch = orjson.loads(response.content)
+        return batch
+
     def _parse_response(self, data: Dict[str, Any], model: str) -> Response:
         """Parse OpenAI response."""
-        choices = []
-        for choice in data.get("choices", []):
-            content = choice.get("message", {}).get("content", "")
-            finish_reason = choice.get("finish_reason")
-            choices.append(Choice(content=content, finish_reason=finish_reason))
+        choices = [
+            # Tool call responses send "content": null
+            {
+                "content": choice.get("message", {}).get("content") or "",
+                "finish_reason": choice.get("finish_reason"),
+            }
+            for choice in data.get("choices", ())
+        ]
 
         usage_data = data.get("usage", {})
-        usage = Usage(
-            prompt_tokens=usage_data.get("prompt_tokens", 0),
-            completion_tokens=usage_data.get("completion_tokens", 0),
-            total_tokens=usage_data.get("total_tokens", 0),
-        )
+        usage = {
+            "prompt_tokens": usage_data.get("prompt_tokens", 0),
+            "completion_tokens": usage_data.get("completion_tokens", 0),
+            "total_tokens": usage_data.get("total_tokens", 0),
+        }
 
-        return Response(
-            text=choices,
-            usage=usage,
-            provider="openai",
-            model=model,
+        # One validation call builds the nested models
+        return Response.model_validate(
+            {"text": choices, "usage": usage, "provider": "openai", "model": model}
         )
 
     def _parse_stream_chunk(self, data: Dict[str, Any]) -> Optional[StreamChunk]:
@@ -241,28 +293,14 @@ class OpenAIProvider(BaseProvider):
 
         choice = choices[0]
         delta = choice.get("delta", {})
-        content = delta.get("content", "")
+        # Tool call deltas send "content": null
+        content = delta.get("content") or ""
         finish_reason = choice.get("finish_reason")
-
-        return StreamChunk(
-            content=content,
-            finish_reason=finish_reason,
-            done=finish_reason is not None,
-        )
-
-    def _handle_http_error(self, error: httpx.HTTPStatusError) -> None:
-        """Handle HTTP errors from OpenAI API."""
-        status_code = error.response.status_code
-
-        if status_code == 401:
-            raise AuthenticationError("Invalid API key", provider="openai")
-        elif status_code == 429:
-            raise RateLimitError("Rate limit exceeded", provider="openai")
-        else:
-            try:
-                error_data = error.response.json()
-                error_message = error_data.get("error", {}).get("message", str(error))
-            except:
-                error_message = str(error)
-
-            raise ProviderError(error_message, provider="openai", status_code=status_code)
\ No newline at end of file
+        if finish_reason is None:
+            if not content:
+                # Role-only first delta or an empty keep-alive; nothing to yield
+                return None
+            # Most chunks; leaving the defaulted fields out validates faster
+            return StreamChunk(content=content)
+
+        return StreamChunk(content=content, finish_reason=finish_reason, done=True)
@@ -0,0 +1,152 @@
+"""Semantic (embedding-similarity) cache index for LLMX."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from llmx.exceptions import CacheError
+
+Embedder = Callable[[str], Sequence[float]]
+
+
+def load_embedder(model_name: str) -> Embedder:
+    """Load a sentence-transformers model as an embedder."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise CacheError(
+            "Semantic caching dependency not installed. "
+            "Install with: pip install 'llmx[semantic]'"
+        ) from e
+
+    model = SentenceTransformer(model_name)
+    return lambda text: model.encode(text, normalize_embeddings=True)
+
+
+class _Bucket:
+    """Prompt vectors that share the same conversation context, oldest first."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((8, dim), dtype=np.float32)
+        # None marks a discarded row; rows before ``start`` have been evicted.
+        # Both are compacted away when the array is next full.
+        self.keys: List[Optional[str]] = []
+        self.start = 0
+        self.live = 0
+
+    def add(self, vector: np.ndarray, key: str) -> None:
+        end = len(self.keys)
+        if end == len(self.vectors):
+            count = end - self.start
+            capacity = len(self.vectors) * (2 if count > len(self.vectors) // 2 else 1)
+            resized = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            resized[:count] = self.vectors[self.start:end]
+            self.vectors = resized
+            self.keys = self.keys[self.start:]
+            self.start = 0
+            end = count
+        self.vectors[end] = vector
+        self.keys.append(key)
+        self.live += 1
+
+    def pop_oldest(self) -> bool:
+        """Evict the oldest row; return whether it was a live entry."""
+        key = self.keys[self.start]
+        self.start += 1
+        if key is None:
+            return False
+        self.live -= 1
+        return True
+
+    def discard(self, key: str) -> bool:
+        """Remove the row of ``key``; return whether it was found."""
+        try:
+            row = self.keys.index(key, self.start)
+        except ValueError:
+            return False
+        self.keys[row] = None
+        # A zero vector scores 0 against every query
+        self.vectors[row] = 0.0
+        self.live -= 1
+        return True
+
+    def search(self, query: np.ndarray) -> Tuple[float, Optional[str]]:
+        scores = self.vectors[self.start:len(self.keys)] @ query
+        best = int(np.argmax(scores))
+        return float(scores[best]), self.keys[self.start + best]
+
+
+class SemanticIndex:
+    """Nearest-neighbour lookup from prompt text to cache keys.
+
+    Prompts are only compared against prompts recorded under the same
+    ``scope`` (the rest of the conversation plus the generation config), so
+    a hit never crosses models, providers or conversation histories.
+    """
+
+    def __init__(self, embedder: Embedder, threshold: float, max_entries: int):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedder(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, scope: str, text: str, key: str) -> None:
+        """Record that ``text`` under ``scope`` is cached at ``key``."""
+        vector = self._embed(text)
+        with self._lock:
+            bucket = self._buckets.get(scope)
+            if bucket is None:
+                bucket = self._buckets[scope] = _Bucket(len(vector))
+            else:
+                self._buckets.move_to_end(scope)
+            bucket.add(vector, key)
+            self._size += 1
+
+            # Over capacity, drop the oldest prompts of the least recently
+            # used context, which may be this one
+            while self._size > self.max_entries:
+                oldest_scope, oldest = next(iter(self._buckets.items()))
+                if oldest.pop_oldest():
+                    self._size -= 1
+                if not oldest.live:
+                    del self._buckets[oldest_scope]
+
+    def search(self, scope: str, text: str) -> Optional[str]:
+        """Return the cache key of the most similar prompt above the threshold."""
+        with self._lock:
+            if scope not in self._buckets:
+                return None
+
+        query = self._embed(text)
+        with self._lock:
+            bucket = self._buckets.get(scope)
+            if bucket is None:
+                return None
+            score, key = bucket.search(query)
+
+        return key if key is not None and score >= self.threshold else None
+
+    def discard(self, scope: str, key: str) -> None:
+        """Forget ``key`` under ``scope``, e.g. once its cache entry has expired."""
+        with self._lock:
+            bucket = self._buckets.get(scope)
+            if bucket is None or not bucket.discard(key):
+                return
+            self._size -= 1
+            if not bucket.live:
+                del self._buckets[scope]
+
+    def clear(self) -> None:
+        """Remove all recorded prompts."""
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
@@ -0,0 +1,72 @@
+"""Helpers for consuming streamed responses."""
+
+import sys
+import time
+from typing import List, Union
+
+from llmx.types import StreamChunk
+
+# Minimum time between stdout flushes while streaming (seconds)
+STREAM_FLUSH_INTERVAL = 0.03
+
+
+class StreamAccumulator:
+    """Collect the content of a streamed response.
+
+    Chunks are kept in a list and joined on demand, so accumulating a long
+    stream costs O(n) rather than the O(n^2) of repeated ``+=``.
+
+    Example:
+        >>> acc = StreamAccumulator()
+        >>> for chunk in generator.generate(messages, stream=True):
+        ...     acc.add(chunk)
+        >>> print(acc.text)
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._token_count = 0
+
+    def add(self, chunk: Union[StreamChunk, str]) -> str:
+        """Append a chunk (or its content) and return the added content."""
+        content = chunk if isinstance(chunk, str) else chunk.content
+        if content:
+            self._parts.append(content)
+            self._token_count += 1
+        return content
+
+    @property
+    def text(self) -> str:
+        """The content received so far."""
+        if len(self._parts) > 1:
+            self._parts[:] = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    @property
+    def bytes(self) -> bytes:
+        """The content received so far, UTF-8 encoded."""
+        return self.text.encode()
+
+    @property
+    def token_count(self) -> int:
+        """Number of non-empty chunks received (one per token unless coalesced)."""
+        return self._token_count
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+class StreamWriter:
+    """Write streamed chunks to stdout without flushing on every chunk."""
+
+    def __init__(self, line_buffered: bool = False):
+        self.line_buffered = line_buffered
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str, done: bool = False) -> None:
+        """Write a chunk, flushing if the interval elapsed or the stream ended."""
+        sys.stdout.write(text)
+        now = time.monotonic()
+        if self.line_buffered or done or now - self._last_flush >= STREAM_FLUSH_INTERVAL:
+            sys.stdout.flush()
+            self._last_flush = now
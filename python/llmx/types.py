@@ -1,12 +1,49 @@
 """Type definitions for LLMX."""
 
 from typing import Any, Dict, List, Literal, Optional, Union
-from pydantic import BaseModel, Field
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PrivateAttr
+from typing_extensions import Annotated
+
+# Build each model's validator and serializer on first use rather than at
+# import, so importing llmx (e.g. for the CLI) doesn't pay for all of them
+_DEFERRED = ConfigDict(defer_build=True)
+# Messages and responses are shared between callers (memoized prompts, cache
+# hits, coalesced requests), so they can't be changed once built
+_FROZEN = ConfigDict(defer_build=True, frozen=True)
+
+# Finish reasons sent by the supported providers. Parsed JSON carries a new
+# string per response; mapping it to these constants lets every cached
+# response share one object per reason.
+_FINISH_REASONS = {
+    reason: reason
+    for reason in (
+        "stop",
+        "length",
+        "content_filter",
+        "tool_calls",
+        "end_turn",
+        "max_tokens",
+        "stop_sequence",
+        "tool_use",
+        "COMPLETE",
+        "MAX_TOKENS",
+    )
+}
+
+
+def _shared_finish_reason(value: Any) -> Any:
+    return _FINISH_REASONS.get(value, value) if isinstance(value, str) else value
 
 
 class Message(BaseModel):
     """A chat message with role and content."""
 
+    # Normalized messages are memoized together with their hashed cache key
+    # (see ``LLMGenerator``). The Literal role validates to its own interned
+    # constants, so equal roles are always the same string object.
+    model_config = _FROZEN
+
     role: Literal["system", "user", "assistant"] = Field(
         description="The role of the message sender"
     )
@@ -16,8 +53,10 @@ class Message(BaseModel):
 class Choice(BaseModel):
     """A single choice in the response."""
 
+    model_config = _FROZEN
+
     content: str = Field(description="The generated text content")
-    finish_reason: Optional[str] = Field(
+    finish_reason: Annotated[Optional[str], BeforeValidator(_shared_finish_reason)] = Field(
         default=None, description="The reason the generation finished"
     )
 
@@ -25,6 +64,8 @@ class Choice(BaseModel):
 class Usage(BaseModel):
     """Token usage information."""
 
+    model_config = _FROZEN
+
     prompt_tokens: int = Field(description="Number of tokens in the prompt")
     completion_tokens: int = Field(description="Number of tokens in the completion")
     total_tokens: int = Field(description="Total number of tokens used")
@@ -33,16 +74,24 @@ class Usage(BaseModel):
 class Response(BaseModel):
     """Response from the LLM provider."""
 
+    model_config = _FROZEN
+
     text: List[Choice] = Field(description="List of generated choices")
     usage: Optional[Usage] = Field(default=None, description="Token usage information")
     provider: str = Field(description="The provider that generated this response")
     model: str = Field(description="The model that generated this response")
     cached: bool = Field(default=False, description="Whether this response was cached")
 
+    # Cache-key hash state of the request messages plus this reply, used to
+    # resume hashing when the conversation continues (see ``CacheManager``)
+    _cache_state: Any = PrivateAttr(default=None)
+
 
 class StreamChunk(BaseModel):
     """A chunk of streamed response."""
 
+    model_config = _FROZEN
+
     content: str = Field(description="The content chunk")
     finish_reason: Optional[str] = Field(
         default=None, description="The reason the generation finished"
@@ -53,6 +102,8 @@ class StreamChunk(BaseModel):
 class ProviderConfig(BaseModel):
     """Configuration for a provider."""
 
+    model_config = _DEFERRED
+
     api_key: Optional[str] = Field(default=None, description="API key for the provider")
     api_base: Optional[str] = Field(default=None, description="Base URL for the API")
     organization: Optional[str] = Field(default=None, description="Organization ID")
@@ -63,6 +114,8 @@ class ProviderConfig(BaseModel):
 class GenerationConfig(BaseModel):
     """Configuration for text generation."""
 
+    model_config = _DEFERRED
+
     model: Optional[str] = Field(default=None, description="Model to use")
     max_tokens: Optional[int] = Field(default=None, description="Maximum tokens to generate")
     temperature: Optional[float] = Field(default=None, description="Sampling temperature")
@@ -74,7 +127,33 @@ class GenerationConfig(BaseModel):
 class CacheConfig(BaseModel):
     """Configuration for caching."""
 
+    model_config = _DEFERRED
+
     enabled: bool = Field(default=True, description="Whether caching is enabled")
     redis_url: Optional[str] = Field(default=None, description="Redis URL for distributed caching")
+    redis_pool_size: int = Field(
+        default=32, description="Maximum connections in the async Redis pool"
+    )
     ttl: int = Field(default=3600, description="TTL for cached entries in seconds")
-    key_prefix: str = Field(default="llmx:", description="Prefix for cache keys")
\ No newline at end of file
+    max_memory_entries: int = Field(
+        default=10_000, description="Maximum number of entries kept in the in-memory cache"
+    )
+    key_prefix: str = Field(default="llmx:", description="Prefix for cache keys")
+    semantic: bool = Field(
+        default=False, description="Also match cached prompts by embedding similarity"
+    )
+    semantic_threshold: float = Field(
+        default=0.92, description="Minimum cosine similarity for a semantic cache hit"
+    )
+    embedding_model: str = Field(
+        default="sentence-transformers/all-MiniLM-L6-v2",
+        description="Embedding model used by the semantic cache",
+    )
+    secure_keys: bool = Field(
+        default=False,
+        description="Use SHA-256 instead of xxh3 for collision-resistant cache keys",
+    )
+    compact_memory: bool = Field(
+        default=False,
+        description="Keep in-memory entries compressed, decoding them on every hit",
+    )
\ No newline at end of file
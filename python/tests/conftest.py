@@ -4,10 +4,38 @@ import pytest
 from unittest.mock import Mock, patch
 from llmx.types import Response, Choice, Usage
 
-
-@pytest.fixture
+# Shared by every test that takes the fixtures below; tests must not mutate them
+_OPENAI_RESPONSE = {
+    "choices": [
+        {
+            "message": {"content": "Hello, world!"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {
+        "prompt_tokens": 10,
+        "completion_tokens": 5,
+        "total_tokens": 15,
+    },
+}
+
+_CLAUDE_RESPONSE = {
+    "content": [{"type": "text", "text": "Hello, world!"}],
+    "stop_reason": "end_turn",
+    "usage": {
+        "input_tokens": 10,
+        "output_tokens": 5,
+    },
+}
+
+_SAMPLE_MESSAGES = [
+    {"role": "user", "content": "Hello!"},
+]
+
+
+@pytest.fixture(scope="session")
 def mock_response():
-    """Mock response for testing."""
+    """Mock response for testing; built once, as responses are frozen."""
     return Response(
         text=[Choice(content="Hello, world!", finish_reason="stop")],
         usage=Usage(prompt_tokens=10, completion_tokens=5, total_tokens=15),
@@ -17,40 +45,19 @@ def mock_response():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openai_response():
     """Mock OpenAI API response."""
-    return {
-        "choices": [
-            {
-                "message": {"content": "Hello, world!"},
-                "finish_reason": "stop",
-            }
-        ],
-        "usage": {
-            "prompt_tokens": 10,
-            "completion_tokens": 5,
-            "total_tokens": 15,
-        },
-    }
-
-
-@pytest.fixture
+    return _OPENAI_RESPONSE
+
+
+@pytest.fixture(scope="session")
 def mock_claude_response():
     """Mock Claude API response."""
-    return {
-        "content": [{"type": "text", "text": "Hello, world!"}],
-        "stop_reason": "end_turn",
-        "usage": {
-            "input_tokens": 10,
-            "output_tokens": 5,
-        },
-    }
+    return _CLAUDE_RESPONSE
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_messages():
     """Sample messages for testing."""
-    return [
-        {"role": "user", "content": "Hello!"},
-    ]
\ No newline at end of file
+    return _SAMPLE_MESSAGES
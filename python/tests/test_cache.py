@@ -1,11 +1,24 @@
 """Tests for caching functionality."""
 
+import os
+
 import pytest
-from unittest.mock import Mock, patch
-from llmx.cache import CacheManager
+from unittest.mock import AsyncMock, Mock, patch
+from llmx.cache import CacheManager, _codec_executor
+from llmx.exceptions import CacheError
+from llmx.semantic import SemanticIndex
 from llmx.types import CacheConfig, GenerationConfig, Message, Response, Choice, Usage
 
 
+def _letter_embedder(text):
+    """Embed text as letter counts so case and punctuation are ignored."""
+    counts = [0.0] * 26
+    for char in text.lower():
+        if "a" <= char <= "z":
+            counts[ord(char) - ord("a")] += 1
+    return counts
+
+
 class TestCacheManager:
     """Test cache manager."""
 
@@ -52,6 +65,58 @@ class TestCacheManager:
         # Different inputs should generate different keys
         assert key1 != key2
 
+    def test_get_cache_key_unset_vs_zero(self):
+        """Test that unset parameters and zero values produce different keys."""
+        cache = CacheManager(CacheConfig())
+        messages = [Message(role="user", content="Hello!")]
+
+        key1 = cache.get_cache_key(messages, GenerationConfig(model="gpt-4"), "openai")
+        key2 = cache.get_cache_key(
+            messages, GenerationConfig(model="gpt-4", temperature=0.0), "openai"
+        )
+
+        assert key1 != key2
+
+    def test_get_cache_key_secure(self):
+        """Test SHA-256 cache key generation."""
+        fast = CacheManager(CacheConfig())
+        secure = CacheManager(CacheConfig(secure_keys=True))
+
+        messages = [Message(role="user", content="Hello!")]
+        gen_config = GenerationConfig(model="gpt-3.5-turbo")
+
+        key = secure.get_cache_key(messages, gen_config, "openai")
+
+        assert key.startswith("llmx:")
+        assert len(key) == len("llmx:") + 64
+        assert key == secure.get_cache_key(messages, gen_config, "openai")
+        assert key != fast.get_cache_key(messages, gen_config, "openai")
+
+    @pytest.mark.parametrize("secure_keys", [False, True])
+    def test_get_cache_key_resumed(self, secure_keys):
+        """Test keys resumed from a conversation prefix match full recomputation."""
+        cache = CacheManager(CacheConfig(secure_keys=secure_keys))
+        gen_config = GenerationConfig(model="gpt-3.5-turbo")
+
+        history = [
+            Message(role="user", content="Hello!"),
+            Message(role="assistant", content="Hi there!"),
+        ]
+        messages = history + [Message(role="user", content="How are you?")]
+
+        state = cache.message_state(history)
+        assert state.count == 2
+
+        key = cache.get_cache_key(messages, gen_config, "openai")
+        assert cache.get_cache_key(messages, gen_config, "openai", prefix=state) == key
+        resumed = cache.message_state(messages, state)
+        assert cache.get_cache_key_from_state(resumed, gen_config, "openai") == key
+
+        # Resuming must not advance the prefix state itself
+        assert cache.get_cache_key(history, gen_config, "openai", prefix=state) == (
+            cache.get_cache_key(history, gen_config, "openai")
+        )
+
     def test_memory_cache_set_get(self):
         """Test memory cache set and get."""
         config = CacheConfig(enabled=True)
@@ -71,6 +136,26 @@ class TestCacheManager:
         assert cached_response is not None
         assert cached_response.text[0].content == "Hello!"
 
+    def test_memory_cache_compact(self):
+        """Test compact memory entries are stored as bytes and decoded on get."""
+        cache = CacheManager(CacheConfig(enabled=True, compact_memory=True))
+
+        response = Response(
+            text=[Choice(content="Hello!", finish_reason="stop")],
+            usage=Usage(prompt_tokens=5, completion_tokens=3, total_tokens=8),
+            provider="test",
+            model="test-model",
+        )
+
+        cache.set("test-key", response)
+
+        assert isinstance(cache._memory_cache["test-key"], bytes)
+        assert cache.get("test-key") == response
+        # Each hit decodes a new response, but finish reasons stay shared
+        assert cache.get("test-key").text[0].finish_reason is (
+            cache.get("test-key").text[0].finish_reason
+        )
+
     def test_cache_disabled(self):
         """Test cache operations when disabled."""
         config = CacheConfig(enabled=False)
@@ -89,6 +174,25 @@ class TestCacheManager:
 
         assert cached_response is None
 
+    def test_memory_cache_evicts_lru(self):
+        """Test memory cache is bounded by max_memory_entries."""
+        cache = CacheManager(CacheConfig(enabled=True, max_memory_entries=2))
+
+        response = Response(
+            text=[Choice(content="Hello!", finish_reason="stop")],
+            provider="test",
+            model="test-model",
+        )
+
+        cache.set("key-1", response)
+        cache.set("key-2", response)
+        cache.get("key-1")
+        cache.set("key-3", response)
+
+        assert cache.get("key-1") is not None
+        assert cache.get("key-2") is None
+        assert cache.get("key-3") is not None
+
     def test_cache_miss(self):
         """Test cache miss."""
         config = CacheConfig(enabled=True)
@@ -110,6 +214,300 @@ class TestCacheManager:
         assert cache._redis_client is not None
         mock_redis.assert_called_once_with("redis://localhost:6379")
 
+    @patch("redis.from_url")
+    def test_redis_cache_round_trip(self, mock_redis):
+        """Test Redis payloads are encoded and decoded."""
+        store = {}
+        mock_client = Mock()
+        mock_client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        mock_client.get.side_effect = store.get
+        mock_redis.return_value = mock_client
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        response = Response(
+            text=[Choice(content="Hello!", finish_reason="stop")],
+            usage=Usage(prompt_tokens=5, completion_tokens=3, total_tokens=8),
+            provider="test",
+            model="test-model",
+        )
+
+        cache.set("test-key", response)
+        assert isinstance(store["test-key"], bytes)
+
+        cache._memory_cache.clear()
+        cached_response = cache.get("test-key")
+        assert cached_response == response
+
+    @patch("redis.from_url")
+    def test_redis_cache_ignores_unknown_format(self, mock_redis):
+        """Test Redis entries in an unknown format are treated as misses."""
+        mock_client = Mock()
+        mock_client.get.return_value = b"\x80\x04legacy-pickle"
+        mock_redis.return_value = mock_client
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+
+        assert cache.get("test-key") is None
+
+    @patch("redis.asyncio.from_url")
+    @patch("redis.from_url")
+    @pytest.mark.asyncio
+    async def test_async_redis_cache(self, mock_redis, mock_aredis):
+        """Test async cache paths use the asyncio Redis client."""
+        store = {}
+        mock_aclient = Mock()
+        mock_aclient.setex = AsyncMock(
+            side_effect=lambda key, ttl, value: store.__setitem__(key, value)
+        )
+        mock_aclient.get = AsyncMock(side_effect=store.get)
+        mock_aredis.return_value = mock_aclient
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        response = Response(
+            text=[Choice(content="Hello!", finish_reason="stop")],
+            provider="test",
+            model="test-model",
+        )
+
+        await cache.async_set("test-key", response)
+        cache._memory_cache.clear()
+        cached_response = await cache.async_get("test-key")
+
+        assert cached_response == response
+        mock_aredis.assert_called_once_with("redis://localhost:6379", max_connections=32)
+        mock_redis.return_value.get.assert_not_called()
+
+    @patch("redis.asyncio.from_url")
+    @patch("redis.from_url")
+    @pytest.mark.asyncio
+    async def test_async_redis_cache_large_payload(self, mock_redis, mock_aredis):
+        """Test large payloads are (de)serialized off the event loop."""
+        store = {}
+        mock_aclient = Mock()
+        mock_aclient.setex = AsyncMock(
+            side_effect=lambda key, ttl, value: store.__setitem__(key, value)
+        )
+        mock_aclient.get = AsyncMock(side_effect=store.get)
+        mock_aredis.return_value = mock_aclient
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        # Random text so the compressed payload stays above the offload threshold
+        response = Response(
+            text=[Choice(content=os.urandom(32 * 1024).hex(), finish_reason="stop")],
+            provider="test",
+            model="test-model",
+        )
+
+        with patch("llmx.cache._codec_executor", wraps=_codec_executor) as executor:
+            await cache.async_set("test-key", response)
+            cache._memory_cache.clear()
+            cached_response = await cache.async_get("test-key")
+
+        assert cached_response == response
+        assert executor.call_count == 2
+
+    @patch("redis.from_url")
+    def test_mget_mset(self, mock_redis):
+        """Test batched cache operations use a single pipeline each."""
+        store = {}
+        pipelines = []
+
+        class FakePipeline:
+            def __init__(self):
+                self.commands = []
+                pipelines.append(self)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def get(self, key):
+                self.commands.append(lambda: store.get(key))
+
+            def setex(self, key, ttl, value):
+                self.commands.append(lambda: store.__setitem__(key, value))
+
+            def execute(self):
+                return [command() for command in self.commands]
+
+        mock_client = Mock()
+        mock_client.pipeline.side_effect = lambda transaction: FakePipeline()
+        mock_redis.return_value = mock_client
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        responses = {
+            f"key-{i}": Response(
+                text=[Choice(content=f"Hello {i}!", finish_reason="stop")],
+                provider="test",
+                model="test-model",
+            )
+            for i in range(10)
+        }
+
+        cache.mset(responses)
+        cache._memory_cache.clear()
+        results = cache.mget([*responses, "missing"])
+
+        assert results == [*responses.values(), None]
+        assert len(pipelines) == 2
+        mock_client.pipeline.assert_called_with(transaction=False)
+
+    @patch("redis.asyncio.from_url")
+    @patch("redis.from_url")
+    @pytest.mark.asyncio
+    async def test_async_mget_mset(self, mock_redis, mock_aredis):
+        """Test batched async cache operations use a single pipeline."""
+        store = {}
+        pipelines = []
+
+        class FakePipeline:
+            def __init__(self):
+                self.commands = []
+                pipelines.append(self)
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            def get(self, key):
+                self.commands.append(lambda: store.get(key))
+
+            def setex(self, key, ttl, value):
+                self.commands.append(lambda: store.__setitem__(key, value))
+
+            async def execute(self):
+                return [command() for command in self.commands]
+
+        mock_aclient = Mock()
+        mock_aclient.pipeline.side_effect = lambda transaction: FakePipeline()
+        mock_aredis.return_value = mock_aclient
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        responses = {
+            f"key-{i}": Response(
+                text=[Choice(content=f"Hello {i}!", finish_reason="stop")],
+                provider="test",
+                model="test-model",
+            )
+            for i in range(3)
+        }
+
+        await cache.async_mset(responses)
+        cache._memory_cache.clear()
+        results = await cache.async_mget(["key-0", "missing", "key-2"])
+
+        assert results == [responses["key-0"], None, responses["key-2"]]
+        assert len(pipelines) == 2
+        mock_aclient.pipeline.assert_called_with(transaction=False)
+
+    def test_semantic_cache(self):
+        """Test paraphrased prompts hit the semantic tier."""
+        cache = CacheManager(CacheConfig(semantic=True), embedder=_letter_embedder)
+        gen_config = GenerationConfig(model="gpt-3.5-turbo")
+        response = Response(
+            text=[Choice(content="A programming language.", finish_reason="stop")],
+            provider="test",
+            model="test-model",
+        )
+
+        messages = [Message(role="user", content="What is Python?")]
+        key = cache.get_cache_key(messages, gen_config, "openai")
+        cache.set(key, response)
+        cache.semantic_add(key, messages, gen_config, "openai")
+
+        paraphrase = [Message(role="user", content="what is python")]
+        assert cache.get(cache.get_cache_key(paraphrase, gen_config, "openai")) is None
+        assert cache.semantic_get(paraphrase, gen_config, "openai") == response
+
+        unrelated = [Message(role="user", content="Tell me about Rust")]
+        assert cache.semantic_get(unrelated, gen_config, "openai") is None
+
+        other_model = GenerationConfig(model="gpt-4")
+        assert cache.semantic_get(paraphrase, other_model, "openai") is None
+
+    def test_semantic_index_bounded_within_scope(self):
+        """Test one conversation scope can't grow past max_entries."""
+        index = SemanticIndex(_letter_embedder, threshold=0.99, max_entries=10)
+        for i in range(100):
+            index.add("scope", "a" * (i + 1) + "b", f"key-{i}")
+
+        assert index._size <= 10
+        # The oldest prompts were evicted first
+        assert index.search("scope", "a" * 100 + "b") == "key-99"
+        assert index.search("scope", "ab") is None
+
+    def test_semantic_get_drops_expired_keys(self):
+        """Test prompts whose cache entry is gone stop matching."""
+        cache = CacheManager(CacheConfig(semantic=True), embedder=_letter_embedder)
+        gen_config = GenerationConfig()
+        messages = [Message(role="user", content="What is Python?")]
+        key = cache.get_cache_key(messages, gen_config, "openai")
+        cache.semantic_add(key, messages, gen_config, "openai")
+
+        # Nothing was cached under ``key``, as if its entry had expired
+        assert cache.semantic_get(messages, gen_config, "openai") is None
+        assert cache._semantic_index._size == 0
+
+    def test_semantic_cache_missing_dependency(self):
+        """Test a missing semantic dependency fails at construction."""
+        with patch("llmx.cache.importlib.util.find_spec", return_value=None):
+            with pytest.raises(CacheError):
+                CacheManager(CacheConfig(semantic=True))
+
+    def test_semantic_cache_disabled(self):
+        """Test semantic lookups are skipped unless enabled."""
+        cache = CacheManager(CacheConfig(), embedder=_letter_embedder)
+        messages = [Message(role="user", content="What is Python?")]
+
+        assert cache.semantic_get(messages, GenerationConfig(), "openai") is None
+        assert cache._semantic_index is None
+
+    def test_track_inflight(self):
+        """Test identical in-flight requests share the leader's result."""
+        cache = CacheManager(CacheConfig())
+
+        with cache.track_inflight("test-key") as leader:
+            with cache.track_inflight("test-key") as follower:
+                assert leader.leader
+                assert not follower.leader
+                assert follower.future is leader.future
+            leader.future.set_result("done")
+
+        assert follower.future.result() == "done"
+        with cache.track_inflight("test-key") as flight:
+            assert flight.leader
+
+    def test_track_inflight_shares_errors(self):
+        """Test a failing leader propagates its error to waiting callers."""
+        cache = CacheManager(CacheConfig())
+
+        with pytest.raises(RuntimeError):
+            with cache.track_inflight("test-key") as leader:
+                with cache.track_inflight("test-key") as follower:
+                    assert leader.leader and not follower.leader
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            follower.future.result()
+
+    @pytest.mark.asyncio
+    async def test_async_track_inflight(self):
+        """Test async in-flight requests share the leader's result."""
+        cache = CacheManager(CacheConfig())
+
+        async with cache.async_track_inflight("test-key") as leader:
+            async with cache.async_track_inflight("test-key") as follower:
+                assert leader.leader
+                assert not follower.leader
+            leader.future.set_result("done")
+
+        assert await follower.future == "done"
+        assert cache._async_inflight == {}
+
     def test_clear_cache(self):
         """Test cache clearing."""
         config = CacheConfig(enabled=True)
@@ -127,4 +525,42 @@ class TestCacheManager:
         assert cache.get("test-key") is not None
 
         cache.clear()
-        assert cache.get("test-key") is None
\ No newline at end of file
+        assert cache.get("test-key") is None
+    @patch("redis.from_url")
+    def test_clear_redis_uses_scan(self, mock_redis):
+        """Test Redis keys are cleared incrementally with SCAN and UNLINK."""
+        mock_client = Mock()
+        mock_client.scan.side_effect = [(7, [b"llmx:a", b"llmx:b"]), (0, [b"llmx:c"])]
+        mock_redis.return_value = mock_client
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        cache.clear()
+
+        assert mock_client.scan.call_count == 2
+        assert mock_client.scan.call_args.args == (7,)
+        mock_client.unlink.assert_any_call(b"llmx:a", b"llmx:b")
+        mock_client.unlink.assert_any_call(b"llmx:c")
+        mock_client.keys.assert_not_called()
+
+    @patch("redis.asyncio.from_url")
+    @patch("redis.from_url")
+    @pytest.mark.asyncio
+    async def test_async_clear(self, mock_redis, mock_aredis):
+        """Test async clear unlinks every scanned key."""
+
+        async def scan_iter(match, count):
+            assert match == "llmx:*"
+            for key in (b"llmx:a", b"llmx:b"):
+                yield key
+
+        mock_aclient = Mock()
+        mock_aclient.scan_iter = scan_iter
+        mock_aclient.unlink = AsyncMock()
+        mock_aredis.return_value = mock_aclient
+
+        cache = CacheManager(CacheConfig(enabled=True, redis_url="redis://localhost:6379"))
+        cache._memory_cache["test-key"] = Mock()
+        await cache.async_clear()
+
+        mock_aclient.unlink.assert_awaited_once_with(b"llmx:a", b"llmx:b")
+        assert len(cache._memory_cache) == 0
@@ -1,7 +1,12 @@
 """Tests for CLI functionality."""
 
+import asyncio
+import threading
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+from llmx import cli
 from llmx.cli import create_parser, test_provider, main
 
 
@@ -12,6 +17,8 @@ class TestCLIParser:
         """Test parser creation."""
         parser = create_parser()
         assert parser.prog == "llmx"
+        # Built once; every test and CLI invocation reuses the same parser
+        assert create_parser() is parser
 
     def test_chat_command(self):
         """Test chat command parsing."""
@@ -45,6 +52,23 @@ class TestCLIParser:
 
         assert args.command == "test"
         assert args.provider == "openai"
+        assert args.concurrency == 4
+
+    def test_test_command_concurrency(self):
+        """Test --concurrency parsing and validation."""
+        parser = create_parser()
+        args = parser.parse_args(["test", "--concurrency", "2"])
+
+        assert args.concurrency == 2
+        with pytest.raises(SystemExit):
+            parser.parse_args(["test", "--concurrency", "0"])
+
+    def test_line_buffered_flag(self):
+        """Test --line-buffered parsing."""
+        parser = create_parser()
+        args = parser.parse_args(["generate", "--provider", "openai", "--stream", "--line-buffered", "Hi"])
+
+        assert args.line_buffered is True
 
 
 class TestCLIFunctions:
@@ -56,9 +80,9 @@ class TestCLIFunctions:
         """Test successful provider test."""
         # Setup mock
         mock_generator = Mock()
-        mock_response = Mock()
-        mock_response.model = "gpt-3.5-turbo"
-        mock_response.text = [Mock(content="Hello, world!")]
+        mock_response = SimpleNamespace(
+            model="gpt-3.5-turbo", text=[SimpleNamespace(content="Hello, world!")]
+        )
         mock_generator.generate.return_value = mock_response
         mock_llm.return_value = mock_generator
 
@@ -80,6 +104,56 @@ class TestCLIFunctions:
         assert result is False
         mock_llm.assert_called_once_with(provider="openai")
 
+    @patch("llmx.cli.list_providers")
+    @patch("llmx.cli.llm")
+    @patch("builtins.print")
+    def test_test_providers_concurrent(self, mock_print, mock_llm, mock_list_providers):
+        """Test all providers are probed concurrently within the concurrency limit."""
+        active = 0
+        peak = 0
+
+        async def probe(messages, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return Mock(model="test-model", text=[Mock(content="Hello, world!")])
+
+        mock_list_providers.return_value = ["a", "b", "c", "d"]
+        mock_llm.return_value.async_generate = probe
+
+        cli.test_providers(concurrency=2)
+
+        assert mock_llm.call_count == 4
+        assert peak == 2
+        mock_print.assert_any_call("Results: 4/4 providers working")
+
+    @patch("builtins.print")
+    @patch("builtins.input")
+    def test_async_chat_mode_reads_off_loop(self, mock_input, mock_print):
+        """Test async chat reads input on a worker thread and exits on EOF."""
+        threads = []
+
+        def read(prompt):
+            threads.append(threading.current_thread())
+            if len(threads) == 1:
+                return "Hello!"
+            raise EOFError
+
+        mock_input.side_effect = read
+        mock_generator = Mock()
+        mock_generator.async_generate = AsyncMock(
+            return_value=Mock(text=[Mock(content="Hi there!")])
+        )
+
+        asyncio.run(cli.async_chat_mode(mock_generator))
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+        mock_generator.async_generate.assert_awaited_once()
+        mock_print.assert_any_call("Hi there!")
+
     @patch("sys.argv", ["llmx", "list"])
     @patch("llmx.cli.print_providers")
     def test_main_list_command(self, mock_print_providers):
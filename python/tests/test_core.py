@@ -1,11 +1,25 @@
 """Tests for core functionality."""
 
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pydantic
 import pytest
 from unittest.mock import Mock, patch
 from llmx import llm
-from llmx.core import LLMGenerator
-from llmx.exceptions import ValidationError
-from llmx.types import Message, GenerationConfig
+from llmx.cache import CacheManager
+from llmx.core import Bulkhead, CircuitBreaker, LLMGenerator
+from llmx.exceptions import (
+    BatchError,
+    CircuitOpenError,
+    ConfigurationError,
+    ProviderError,
+    ValidationError,
+)
+from llmx.types import CacheConfig, Message, GenerationConfig, StreamChunk
 
 
 class TestLLMGenerator:
@@ -33,7 +47,16 @@ class TestLLMGenerator:
         messages = [Message(role="user", content="Hello!")]
         normalized = generator._normalize_messages(messages)
         assert len(normalized) == 1
-        assert isinstance(normalized[0], Message)
+        assert normalized[0] is messages[0]
+
+    def test_normalized_messages_frozen(self):
+        """Test memoized messages can't be changed after their key is hashed."""
+        generator = llm(provider="openai")
+        prepared, _, _ = generator._prepare_cached(
+            [{"role": "user", "content": "Hello!"}], GenerationConfig(), None
+        )
+        with pytest.raises(pydantic.ValidationError):
+            prepared[0].content = "Goodbye!"
 
     def test_normalize_messages_invalid(self):
         """Test message normalization with invalid input."""
@@ -53,6 +76,50 @@ class TestLLMGenerator:
         assert response.text[0].content == "Hello, world!"
         mock_generate.assert_called_once()
 
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_generate_previous_response(self, mock_generate, mock_response):
+        """Test cache keys resume from the previous turn of a conversation."""
+        mock_generate.side_effect = lambda *args, **kwargs: mock_response.model_copy()
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+        first = generator.generate(messages)
+        assert first._cache_state.count == 2
+
+        messages += [
+            {"role": "assistant", "content": first.text[0].content},
+            {"role": "user", "content": "How are you?"},
+        ]
+        with patch.object(
+            generator.cache, "message_state", wraps=generator.cache.message_state
+        ) as message_state:
+            generator.generate(messages, previous_response=first)
+
+        assert message_state.call_args_list[0].args[1] is first._cache_state
+        config = mock_generate.call_args.args[1]
+        expected = generator.cache.get_cache_key(
+            generator._normalize_messages(messages), config, "openai"
+        )
+        assert generator.cache.get(expected) is not None
+
+    @pytest.mark.parametrize(
+        "cache_config, use_cache", [(CacheConfig(enabled=False), True), (None, False)]
+    )
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_generate_without_cache_skips_key(
+        self, mock_generate, cache_config, use_cache, mock_response
+    ):
+        """Test no cache key is computed when caching is disabled or bypassed."""
+        mock_generate.return_value = mock_response
+
+        generator = llm(provider="openai", cache_config=cache_config)
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.cache, "message_state") as message_state:
+            generator.generate(messages, use_cache=use_cache)
+
+        message_state.assert_not_called()
+        mock_generate.assert_called_once()
+
     @patch("llmx.providers.openai.OpenAIProvider.async_generate")
     @pytest.mark.asyncio
     async def test_async_generate(self, mock_generate, mock_response):
@@ -66,6 +133,449 @@ class TestLLMGenerator:
         assert response.text[0].content == "Hello, world!"
         mock_generate.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_async_generate_deduplicates_inflight(self, mock_response):
+        """Test concurrent identical requests make a single provider call."""
+        calls = []
+
+        async def slow_generate(messages, config, **kwargs):
+            calls.append(messages)
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.provider, "async_generate", side_effect=slow_generate):
+            responses = await asyncio.gather(
+                *(generator.async_generate(messages) for _ in range(5))
+            )
+
+        assert len(calls) == 1
+        assert all(response is responses[0] for response in responses)
+
+    @pytest.mark.asyncio
+    async def test_async_generate_leader_cancelled(self, mock_response):
+        """Test cancelling the leader of a shared request doesn't cancel its followers."""
+        calls = []
+
+        async def slow_generate(messages, config, **kwargs):
+            calls.append(messages)
+            await asyncio.sleep(0.05)
+            return mock_response
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.provider, "async_generate", side_effect=slow_generate):
+            leader = asyncio.ensure_future(generator.async_generate(messages))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(generator.async_generate(messages))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            response = await follower
+
+        assert leader.cancelled()
+        assert response.text[0].content == "Hello, world!"
+        # The follower took over as leader and called the provider itself
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_generate_coalesce_disabled(self, mock_response):
+        """Test coalesce=False sends every concurrent request upstream."""
+        calls = []
+
+        async def slow_generate(messages, config, **kwargs):
+            calls.append(messages)
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        generator = llm(provider="openai", coalesce=False)
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.provider, "async_generate", side_effect=slow_generate):
+            await asyncio.gather(*(generator.async_generate(messages) for _ in range(3)))
+
+        assert len(calls) == 3
+
+    @patch("llmx.providers.openai.OpenAIProvider.generate_stream")
+    def test_generate_stream_coalesce(self, mock_stream):
+        """Test chunks arriving within the coalescing window are merged."""
+        mock_stream.side_effect = lambda *args, **kwargs: iter(
+            [
+                StreamChunk(content="Hello"),
+                StreamChunk(content=", "),
+                StreamChunk(content="world!", finish_reason="stop", done=True),
+            ]
+        )
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+
+        chunks = list(generator.generate(messages, stream=True, coalesce_ms=60_000))
+        assert [chunk.content for chunk in chunks] == ["Hello, world!"]
+        assert chunks[0].done and chunks[0].finish_reason == "stop"
+
+        chunks = list(generator.generate(messages, stream=True))
+        assert len(chunks) == 3
+
+    @pytest.mark.asyncio
+    async def test_async_generate_stream_coalesce(self):
+        """Test async chunks are flushed once the coalescing window elapses."""
+
+        async def slow_stream(messages, config, **kwargs):
+            yield StreamChunk(content="Hello")
+            await asyncio.sleep(0.05)
+            yield StreamChunk(content=", ")
+            yield StreamChunk(content="world!", done=True)
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.provider, "async_generate_stream", side_effect=slow_stream):
+            stream = await generator.async_generate(messages, stream=True, coalesce_ms=20)
+            chunks = [chunk.content async for chunk in stream]
+
+        assert chunks == ["Hello, ", "world!"]
+
+    @pytest.mark.asyncio
+    async def test_async_generate_stream_batched(self):
+        """Test batched streaming yields lists of chunks in stream order."""
+
+        async def stream(messages, config, **kwargs):
+            yield StreamChunk(content="Hello")
+            yield StreamChunk(content="!", done=True)
+
+        generator = llm(provider="openai")
+        messages = [{"role": "user", "content": "Hello!"}]
+        with patch.object(generator.provider, "async_generate_stream", side_effect=stream):
+            batches = await generator.async_generate(messages, stream=True, batched=True)
+            contents = [[chunk.content for chunk in batch] async for batch in batches]
+
+        assert contents == [["Hello"], ["!"]]
+
+    @pytest.mark.asyncio
+    async def test_batch_generate_small_runs_concurrently(self, mock_response):
+        """Test small workloads fall back to concurrent async_generate calls."""
+        generator = llm(provider="openai")
+        messages_list = [[{"role": "user", "content": f"Question {i}"}] for i in range(3)]
+
+        with patch.object(
+            generator.provider, "async_generate", return_value=mock_response
+        ) as mock_generate, patch.object(
+            generator.provider, "async_batch_generate"
+        ) as mock_batch:
+            responses = await generator.batch_generate(messages_list)
+
+        assert len(responses) == 3
+        assert mock_generate.call_count == 3
+        mock_batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_generate_uses_batch_api(self, mock_response):
+        """Test large workloads submit only uncached conversations as a batch."""
+        from llmx.core import BATCH_MIN_SIZE
+
+        generator = llm(provider="openai")
+        messages_list = [
+            [{"role": "user", "content": f"Question {i}"}] for i in range(BATCH_MIN_SIZE + 1)
+        ]
+
+        # Prime the cache with the first conversation
+        with patch.object(generator.provider, "async_generate", return_value=mock_response):
+            await generator.async_generate(messages_list[0])
+
+        async def batch(messages_list, config, timeout, **kwargs):
+            return [mock_response.model_copy() for _ in messages_list]
+
+        with patch.object(
+            generator.provider, "async_batch_generate", side_effect=batch
+        ) as mock_batch:
+            responses = await generator.batch_generate(messages_list)
+
+        assert len(responses) == BATCH_MIN_SIZE + 1
+        assert responses[0].cached
+        assert len(mock_batch.call_args.args[0]) == BATCH_MIN_SIZE
+
+        # Batch results are cached for the next call
+        with patch.object(generator.provider, "async_batch_generate") as mock_batch:
+            responses = await generator.batch_generate(messages_list)
+        mock_batch.assert_not_called()
+        assert all(response.cached for response in responses)
+
+    @pytest.mark.asyncio
+    async def test_batch_generate_partial_failure(self, mock_response):
+        """Test successful results of a partly failed batch are cached and not resubmitted."""
+        from llmx.core import BATCH_MIN_SIZE
+
+        generator = llm(provider="openai")
+        messages_list = [
+            [{"role": "user", "content": f"Question {i}"}] for i in range(BATCH_MIN_SIZE)
+        ]
+
+        async def partial(messages_list, config, timeout, **kwargs):
+            results = [mock_response] * len(messages_list)
+            results[-1] = None
+            raise BatchError("1 request failed", provider="openai", results=results)
+
+        with patch.object(generator.provider, "async_batch_generate", side_effect=partial):
+            with pytest.raises(BatchError) as exc_info:
+                await generator.batch_generate(messages_list)
+        assert exc_info.value.failed == [BATCH_MIN_SIZE - 1]
+
+        async def batch(messages_list, config, timeout, **kwargs):
+            return [mock_response] * len(messages_list)
+
+        with patch.object(
+            generator.provider, "async_batch_generate", side_effect=batch
+        ) as mock_batch:
+            responses = await generator.batch_generate(messages_list)
+
+        # Only the failed conversation is submitted again
+        assert mock_batch.call_args.args[0] == [generator._normalize_messages(messages_list[-1])]
+        assert all(response.cached for response in responses[:-1])
+
+    @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"})
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_fallback_providers_built_once(self, mock_generate, mock_response):
+        """Test fallback providers are created at init and reused on failure."""
+        mock_generate.side_effect = ProviderError("down", provider="openai")
+
+        generator = llm(provider="openai", fallback_providers=["claude"])
+        (name, fallback), = generator._fallbacks
+        assert name == "claude"
+
+        with patch("llmx.core.get_provider") as mock_get_provider, patch.object(
+            fallback, "generate", return_value=mock_response
+        ):
+            generator.generate([{"role": "user", "content": "Hello!"}])
+            generator.generate([{"role": "user", "content": "Hello again!"}])
+
+        mock_get_provider.assert_not_called()
+
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_repeated_prompt_skips_preparation(self, mock_generate, mock_response):
+        """Test identical prompts reuse their normalized messages and cache key."""
+        mock_generate.return_value = mock_response
+
+        generator = llm(provider="openai")
+        with patch.object(
+            generator, "_normalize_messages", wraps=generator._normalize_messages
+        ) as normalize:
+            first = generator.generate([{"role": "user", "content": "Hello!"}])
+            second = generator.generate([{"role": "user", "content": "Hello!"}])
+            generator.generate([{"role": "user", "content": "Hello!"}], temperature=0.5)
+
+        assert second.cached and not first.cached
+        assert second.text == first.text
+        assert normalize.call_count == 2
+        assert mock_generate.call_count == 2
+
+    @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"})
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_fallback_responses_cached(self, mock_generate, mock_response):
+        """Test fallback responses are cached under the fallback provider."""
+        mock_generate.side_effect = ProviderError("down", provider="openai")
+
+        generator = llm(provider="openai", fallback_providers=["claude"])
+        (_, fallback), = generator._fallbacks
+        messages = [{"role": "user", "content": "Hello!"}]
+
+        with patch.object(fallback, "generate", return_value=mock_response) as mock_fallback:
+            generator.generate(messages)
+            response = generator.generate(messages)
+
+        assert response.cached
+        mock_fallback.assert_called_once()
+
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_generate_semantic_cache(self, mock_generate, mock_response):
+        """Test paraphrased deterministic prompts are served from the semantic tier."""
+        mock_generate.side_effect = lambda *args, **kwargs: mock_response.model_copy()
+
+        def embedder(text):
+            return [text.lower().count(char) for char in "abcdefghijklmnopqrstuvwxyz"]
+
+        generator = llm(provider="openai")
+        generator.cache = CacheManager(CacheConfig(semantic=True), embedder=embedder)
+
+        generator.generate([{"role": "user", "content": "What is Python?"}])
+        response = generator.generate([{"role": "user", "content": "what is python"}])
+        assert response.cached
+        assert mock_generate.call_count == 1
+
+        # Sampled requests only match exactly
+        generator.generate([{"role": "user", "content": "WHAT is python"}], temperature=0.7)
+        assert mock_generate.call_count == 2
+
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_generate_semantic_cache_failure(self, mock_generate, mock_response):
+        """Test a failing semantic tier falls through to the provider."""
+        mock_generate.return_value = mock_response
+
+        def embedder(text):
+            raise RuntimeError("embedding model unavailable")
+
+        generator = llm(provider="openai")
+        generator.cache = CacheManager(CacheConfig(semantic=True), embedder=embedder)
+
+        response = generator.generate([{"role": "user", "content": "What is Python?"}])
+        assert response.text[0].content == "Hello, world!"
+
+    def test_fallback_provider_unknown(self):
+        """Test unknown fallback providers are rejected at init."""
+        with pytest.raises(ConfigurationError):
+            llm(provider="openai", fallback_providers=["invalid_provider"])
+
+    def test_fallback_provider_without_credentials(self):
+        """Test fallbacks that cannot be configured are skipped."""
+        with patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"}, clear=True):
+            generator = llm(provider="openai", fallback_providers=["claude"])
+
+        assert generator._fallbacks == []
+        assert "claude" in generator._fallback_errors
+
+    @pytest.mark.asyncio
+    async def test_context_manager_closes_clients(self):
+        """Test exiting the generator closes the clients of every provider."""
+        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}):
+            async with llm(provider="openai", fallback_providers=["claude"]) as generator:
+                providers = generator._providers()
+                # Async clients are created on first use
+                assert all(p.async_client for p in providers)
+
+        assert len(providers) == 2
+        assert all(p.client.is_closed and p.async_client.is_closed for p in providers)
+
+        with llm(provider="openai") as generator:
+            pass
+        assert generator.provider.client.is_closed
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker."""
+
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after consecutive failures and fails fast."""
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+        failing = Mock(side_effect=ProviderError("down", provider="test"))
+
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                breaker.call(failing)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.call(failing)
+        assert failing.call_count == 2
+        assert 0 < exc_info.value.retry_after <= 30
+
+    def test_half_open_probe(self):
+        """Test a successful probe after the reset timeout closes the circuit."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+        with pytest.raises(ProviderError):
+            breaker.call(Mock(side_effect=ProviderError("down", provider="test")))
+
+        with patch("llmx.core.time.monotonic", return_value=time.monotonic() + 31):
+            assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.failure_count == 0
+
+    def test_ignores_request_errors(self):
+        """Test invalid requests do not count as provider failures."""
+        breaker = CircuitBreaker("test", failure_threshold=1)
+        with pytest.raises(ValidationError):
+            breaker.call(Mock(side_effect=ValidationError("bad input")))
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"})
+    @patch("llmx.providers.claude.ClaudeProvider.generate")
+    @patch("llmx.providers.openai.OpenAIProvider.generate")
+    def test_generator_skips_open_provider(self, mock_openai, mock_claude, mock_response):
+        """Test an open circuit goes straight to the fallback provider."""
+        mock_openai.side_effect = ProviderError("down", provider="openai")
+        mock_claude.return_value = mock_response
+
+        generator = llm(provider="openai", fallback_providers=["claude"])
+        for i in range(7):
+            response = generator.generate([{"role": "user", "content": f"Hello {i}"}])
+            assert response.text[0].content == "Hello, world!"
+
+        # The breaker stops calling OpenAI after its failure threshold
+        assert mock_openai.call_count == generator._breakers["openai"].failure_threshold
+        assert mock_claude.call_count == 7
+
+
+class TestBulkhead:
+    """Test per-provider concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_async_generate_limits_concurrency(self, mock_response):
+        """Test at most max_concurrent provider calls run at once."""
+        running = []
+        peak = 0
+
+        async def slow_generate(messages, config, **kwargs):
+            nonlocal peak
+            running.append(messages)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return mock_response
+
+        generator = llm(provider="openai", max_concurrent=2)
+        with patch.object(generator.provider, "async_generate", side_effect=slow_generate):
+            await asyncio.gather(
+                *(
+                    generator.async_generate([{"role": "user", "content": f"Hello {i}"}])
+                    for i in range(6)
+                )
+            )
+
+        assert peak == 2
+
+    @pytest.mark.parametrize("limit", [0, -1])
+    def test_invalid_limit(self, limit):
+        """Test limits below 1 are rejected instead of blocking every call."""
+        with pytest.raises(ConfigurationError):
+            llm(provider="openai", max_concurrent=limit)
+
+    def test_bulkhead_per_event_loop(self):
+        """Test each event loop gets its own semaphore."""
+        bulkhead = Bulkhead(1)
+
+        async def call():
+            return await bulkhead.async_call(lambda: asyncio.sleep(0, result="done"))
+
+        assert asyncio.run(call()) == "done"
+        assert asyncio.run(call()) == "done"
+        assert bulkhead.call(lambda: "done") == "done"
+
+    def test_unlimited(self):
+        """Test max_concurrent=None disables the bulkheads."""
+        generator = llm(provider="openai", max_concurrent=None)
+        assert generator._bulkheads == {}
+
+    def test_default_limit_from_environment(self):
+        """Test LLMX_MAX_CONCURRENCY sets the default limit."""
+        code = (
+            "from llmx import llm\n"
+            "generator = llm(provider='openai')\n"
+            "assert generator._bulkheads['openai'].limit == 8\n"
+        )
+        env = {**os.environ, "LLMX_MAX_CONCURRENCY": "8", "OPENAI_API_KEY": "test-key"}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    @pytest.mark.parametrize("value", ["abc", "0", "-3"])
+    def test_invalid_limit_from_environment(self, value):
+        """Test an invalid LLMX_MAX_CONCURRENCY warns and keeps the default."""
+        code = (
+            "import warnings\n"
+            "with warnings.catch_warnings(record=True) as caught:\n"
+            "    warnings.simplefilter('always')\n"
+            "    import llmx.core\n"
+            "assert llmx.core.MAX_CONCURRENT == 50\n"
+            "assert 'LLMX_MAX_CONCURRENCY' in str(caught[0].message)\n"
+        )
+        env = {**os.environ, "LLMX_MAX_CONCURRENCY": value}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
 
 class TestLLMFunction:
     """Test llm function."""
@@ -74,4 +584,14 @@ class TestLLMFunction:
         """Test llm function creates LLMGenerator."""
         generator = llm(provider="openai")
         assert isinstance(generator, LLMGenerator)
-        assert generator.provider_name == "openai"
\ No newline at end of file
+        assert generator.provider_name == "openai"
+
+    def test_import_is_lazy(self):
+        """Test importing llmx defers loading the core until llm is used."""
+        code = (
+            "import sys, llmx\n"
+            "assert 'llmx.core' not in sys.modules\n"
+            "llmx.llm\n"
+            "assert 'llmx.core' in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,60 @@
+"""Tests for streaming helpers."""
+
+from unittest.mock import patch
+
+from llmx import StreamAccumulator, StreamWriter
+from llmx.types import StreamChunk
+
+
+class TestStreamAccumulator:
+    """Test stream accumulator."""
+
+    def test_accumulate_chunks(self):
+        """Test chunks and strings are joined in order."""
+        acc = StreamAccumulator()
+
+        assert acc.add(StreamChunk(content="Hello")) == "Hello"
+        acc.add(", ")
+        acc.add(StreamChunk(content=""))
+        acc.add(StreamChunk(content="wörld!", done=True))
+
+        assert acc.text == "Hello, wörld!"
+        assert acc.bytes == "Hello, wörld!".encode()
+        assert acc.token_count == 3
+        assert len(acc) == 13
+
+    def test_add_after_read(self):
+        """Test reading the text does not stop further accumulation."""
+        acc = StreamAccumulator()
+        assert acc.text == ""
+
+        acc.add("Hello")
+        acc.add(", ")
+        assert acc.text == "Hello, "
+
+        acc.add("world!")
+        assert acc.text == "Hello, world!"
+        assert acc.token_count == 3
+
+
+class TestStreamWriter:
+    """Test stream writer."""
+
+    @patch("sys.stdout")
+    def test_stream_writer_throttles_flushes(self, mock_stdout):
+        """Test streamed chunks are flushed only when the interval elapses or the stream ends."""
+        writer = StreamWriter()
+        writer.write("Hello")
+        writer.write(", world", done=True)
+
+        assert mock_stdout.write.call_count == 2
+        mock_stdout.flush.assert_called_once()
+
+    @patch("sys.stdout")
+    def test_stream_writer_line_buffered(self, mock_stdout):
+        """Test line-buffered mode flushes every chunk."""
+        writer = StreamWriter(line_buffered=True)
+        writer.write("Hello")
+        writer.write(", world")
+
+        assert mock_stdout.flush.call_count == 2